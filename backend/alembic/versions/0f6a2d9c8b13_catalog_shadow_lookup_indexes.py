@@ -0,0 +1,31 @@
+"""catalog (user_id, official_id) indexes
+
+Revision ID: 0f6a2d9c8b13
+Revises: e7b1c04a9d52
+Create Date: 2026-10-18 11:20:06.731950
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0f6a2d9c8b13"
+down_revision: Union[str, Sequence[str], None] = "e7b1c04a9d52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# serves both "user_id = :me" and the NOT EXISTS shadow check
+# (user_id = :me AND official_id = official.id) of the catalog listings
+TABLES = ("equipments", "fermentables", "hops", "misc", "yeasts")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in TABLES:
+        op.create_index(f"ix_{table}_user_id_official_id", table, ["user_id", "official_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.drop_index(f"ix_{table}_user_id_official_id", table_name=table)
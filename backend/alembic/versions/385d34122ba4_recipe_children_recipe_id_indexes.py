@@ -0,0 +1,38 @@
+"""recipe children recipe_id indexes
+
+Revision ID: 385d34122ba4
+Revises: a321b4f2f480
+Create Date: 2026-10-18 10:03:17.554920
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "385d34122ba4"
+down_revision: Union[str, Sequence[str], None] = "a321b4f2f480"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# declared with index=True in app/models.py but never created by the
+# initial migration; the selectin loaders and the summary counts look
+# children up by recipe_id
+TABLES = (
+    "recipe_equipment",
+    "recipe_fermentables",
+    "recipe_hops",
+    "recipe_misc",
+    "recipe_yeasts",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in TABLES:
+        op.create_index(f"ix_{table}_recipe_id", table, ["recipe_id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.drop_index(f"ix_{table}_recipe_id", table_name=table, if_exists=True)
@@ -0,0 +1,38 @@
+"""updated_at on recipes and catalogs
+
+Revision ID: 3c5e8a1f7d24
+Revises: 0f6a2d9c8b13
+Create Date: 2026-10-18 15:42:18.204113
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "3c5e8a1f7d24"
+down_revision: Union[str, Sequence[str], None] = "0f6a2d9c8b13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("recipes", "equipments", "fermentables", "hops", "misc", "yeasts")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in TABLES:
+        op.add_column(
+            table,
+            sa.Column(
+                "updated_at",
+                sa.DateTime(timezone=True),
+                server_default=sa.text("now()"),
+                nullable=False,
+            ),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.drop_column(table, "updated_at")
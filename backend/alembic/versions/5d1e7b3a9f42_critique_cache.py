@@ -0,0 +1,40 @@
+"""critique cache
+
+Revision ID: 5d1e7b3a9f42
+Revises: 8b2f4e6a9c31
+Create Date: 2026-10-18 18:12:09.304517
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5d1e7b3a9f42"
+down_revision: Union[str, Sequence[str], None] = "8b2f4e6a9c31"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "critique_cache",
+        sa.Column("key", sa.String(length=64), nullable=False),
+        sa.Column("model", sa.String(length=100), nullable=False),
+        sa.Column("response", sa.Text(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_index("ix_critique_cache_created_at", "critique_cache", ["created_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_critique_cache_created_at", table_name="critique_cache")
+    op.drop_table("critique_cache")
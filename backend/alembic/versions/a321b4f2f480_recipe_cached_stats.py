@@ -0,0 +1,43 @@
+"""recipe cached stats (og, fg, abv, ibu, ebc, bu_gu)
+
+Revision ID: a321b4f2f480
+Revises: 51cd41757aab
+Create Date: 2026-10-18 09:12:41.208113
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "a321b4f2f480"
+down_revision: Union[str, Sequence[str], None] = "51cd41757aab"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # filled by app.scripts.backfill_recipe_stats and kept up to date on write
+    op.add_column("recipes", sa.Column("og", sa.Numeric(), nullable=True))
+    op.add_column("recipes", sa.Column("fg", sa.Numeric(), nullable=True))
+    op.add_column("recipes", sa.Column("abv", sa.Numeric(), nullable=True))
+    op.add_column("recipes", sa.Column("ibu", sa.Numeric(), nullable=True))
+    op.add_column("recipes", sa.Column("ebc", sa.Numeric(), nullable=True))
+    op.add_column("recipes", sa.Column("bu_gu", sa.Numeric(), nullable=True))
+
+    op.create_index("ix_recipes_user_id_abv", "recipes", ["user_id", "abv"])
+    op.create_index("ix_recipes_user_id_ibu", "recipes", ["user_id", "ibu"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_recipes_user_id_ibu", table_name="recipes")
+    op.drop_index("ix_recipes_user_id_abv", table_name="recipes")
+
+    op.drop_column("recipes", "bu_gu")
+    op.drop_column("recipes", "ebc")
+    op.drop_column("recipes", "ibu")
+    op.drop_column("recipes", "abv")
+    op.drop_column("recipes", "fg")
+    op.drop_column("recipes", "og")
@@ -0,0 +1,41 @@
+"""pg_trgm search indexes on name/description
+
+Revision ID: e7b1c04a9d52
+Revises: 385d34122ba4
+Create Date: 2026-10-18 10:41:52.118406
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e7b1c04a9d52"
+down_revision: Union[str, Sequence[str], None] = "385d34122ba4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("equipments", "fermentables", "hops", "misc", "yeasts", "recipes")
+COLUMNS = ("name", "description")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for table in TABLES:
+        for column in COLUMNS:
+            op.create_index(
+                f"ix_{table}_{column}_trgm",
+                table,
+                [column],
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        for column in COLUMNS:
+            op.drop_index(f"ix_{table}_{column}_trgm", table_name=table)
+    # the extension is left installed: other objects may depend on it
@@ -17,11 +17,47 @@ class Settings(BaseSettings):
     DB_PORT: int = 5433
     DB_NAME: str = "brewchemy"
 
+    # "null" opens a connection per session (safe behind PgBouncer),
+    # "queue" keeps a per-worker pool of long-lived connections.
+    DB_POOL_MODE: str = "null"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # PgBouncer (transaction mode) can't keep prepared statements between
+    # transactions, so the asyncpg statement cache is only enabled without it.
+    DB_PGBOUNCER: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    # ---- Catalog
+    # Official (admin) ingredients are cached per worker; 0 disables the cache.
+    # Catalogs with more official rows than the limit are always read from the DB.
+    CATALOG_CACHE_TTL_SECONDS: int = 300
+    CATALOG_CACHE_MAX_ITEMS: int = 5000
+
     # ---- Auth / CORS
     JWT_SECRET: str
     JWT_ALG: str = "HS256"
+    # "jose" (python-jose) or "pyjwt" (PyJWT, faster); same token format
+    JWT_BACKEND: str = "jose"
     CORS_ORIGINS: str = "*"
 
+    # Verified access tokens are cached per worker (never past their exp);
+    # 0 disables. The user cache behind /me is off by default: user changes
+    # made on another worker are only seen once the entry expires.
+    TOKEN_CACHE_TTL_SECONDS: int = 300
+    USER_CACHE_TTL_SECONDS: int = 0
+    AUTH_CACHE_SIZE: int = 10000
+
+    # Argon2id cost of new hashes; older hashes are upgraded on the next login.
+    # Pick them with app/scripts/benchmark_argon2.py.
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_TIME_COST: int = 2
+    ARGON2_PARALLELISM: int = 2
+    # Argon2 hashes running at once per worker (each one uses ARGON2_MEMORY_COST)
+    PASSWORD_HASH_WORKERS: int = 2
+
     GOOGLE_CLIENT_ID: Optional[str] = None
     GOOGLE_CLIENT_SECRET: Optional[str] = None
     GOOGLE_REDIRECT_URI: Optional[str] = None
@@ -35,9 +71,39 @@ class Settings(BaseSettings):
     MAIL_PASSWORD: Optional[str] = None
     MAIL_DEFAULT_SENDER: Optional[EmailStr] = None
     MAIL_USE_TLS: bool = True
+    # "smtp", or "console" to log the mails instead (see services/mail.py)
+    MAIL_TRANSPORT: str = "smtp"
+    MAIL_IDLE_SECONDS: float = 60.0
+    MAIL_TIMEOUT_SECONDS: float = 15.0
+
+    # ---- Outbox (services/outbox.py)
+    # every web worker also dispatches; turn off when app/scripts/outbox_dispatcher.py
+    # runs as its own process. Each look at the outbox takes a DB connection: with
+    # DB_POOL_MODE="null" that is a new connection per poll and per worker, even
+    # when the outbox is empty.
+    OUTBOX_DISPATCH_IN_APP: bool = True
+    OUTBOX_BATCH_SIZE: int = 50
+    OUTBOX_POLL_SECONDS: float = 5.0
+    # a claimed batch must be sent within this time, or other dispatchers send it again
+    OUTBOX_LEASE_SECONDS: float = 300.0
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    OUTBOX_BACKOFF_SECONDS: float = 10.0
 
     # ---- OpenAI
     OPENAI_API_KEY: Optional[str] = None
+    OPENAI_MODEL: str = "gpt-3.5-turbo"
+    # another OpenAI-compatible server (proxy, local stub...); None = api.openai.com
+    OPENAI_BASE_URL: Optional[str] = None
+    # one client per worker process, see services/openai_client.py
+    OPENAI_MAX_CONNECTIONS: int = 20
+    OPENAI_MAX_KEEPALIVE: int = 10
+    OPENAI_CONNECT_SECONDS: float = 5.0
+    OPENAI_TIMEOUT_SECONDS: float = 60.0
+    OPENAI_MAX_RETRIES: int = 2
+    # critiques are reused for the same text, model and prompt (services/critiques.py);
+    # 0 disables the cache. CRITIQUE_CACHE_SIZE entries are also kept per worker.
+    CRITIQUE_CACHE_TTL_SECONDS: int = 604800
+    CRITIQUE_CACHE_SIZE: int = 1000
 
     class Config:
         env_file = ".env"
@@ -1,5 +1,8 @@
 # app/database.py
 import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
@@ -24,15 +27,45 @@ def to_async_url(url: str) -> str:
 
 ASYNC_DATABASE_URL = to_async_url(settings.DATABASE_URL)
 
-engine = create_async_engine(
-    ASYNC_DATABASE_URL,
-    poolclass=NullPool,
-    pool_pre_ping=True,
-    connect_args={
-        "statement_cache_size": 0,
-        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
-    },
-)
+
+def engine_options() -> dict:
+    if settings.DB_PGBOUNCER:
+        # PgBouncer may hand each transaction a different server connection:
+        # no statement cache and unique names so prepared statements never clash.
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    else:
+        # direct connection: asyncpg (and SQLAlchemy's adapter) keep prepared
+        # statements per connection, so repeated queries skip parse/plan.
+        connect_args = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+    if settings.DB_POOL_MODE == "queue":
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    elif settings.DB_POOL_MODE == "null":
+        options["poolclass"] = NullPool
+    else:
+        raise ValueError(f"Invalid DB_POOL_MODE: {settings.DB_POOL_MODE!r}")
+
+    return options
+
+
+engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options())
 
 _session_factory = async_sessionmaker(
     bind=engine,
@@ -49,4 +82,23 @@ async def get_db() -> AsyncSession:
     try:
         yield db
     finally:
-        await db.close()
\ No newline at end of file
+        await db.close()
+
+
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[AsyncSession]:
+    """
+    A new session outside of the request's one, for background tasks: they
+    run in the request's asyncio task after get_db() has already closed its
+    session, so SessionLocal() would hand back that same session.
+    Commits on success, rolls back on error.
+    """
+    db: AsyncSession = _session_factory()
+    try:
+        yield db
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
@@ -1,8 +1,16 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from starlette.middleware.sessions import SessionMiddleware
 
 from .config import settings
+from .database import engine
+from .security import hash_pool
+from .services.critiques import critique_cache
+from .services.openai_client import openai_client
+from .services.outbox import outbox_dispatcher
 from .routers import users
 from .routers import equipments
 from .routers import fermentables
@@ -12,7 +20,27 @@ from .routers import yeasts
 from .routers import recipes
 from .routers import openai
 
-app = FastAPI(title="Brewchemy API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.OUTBOX_DISPATCH_IN_APP:
+        outbox_dispatcher.start()
+    openai_client.open()
+    yield
+    await outbox_dispatcher.stop()
+    await openai_client.close()
+    # closes pooled connections when the worker shuts down
+    await engine.dispose()
+    hash_pool.shutdown()
+
+
+# orjson instead of json.dumps for every endpoint; the recipe lists go further,
+# see utils/responses.py
+app = FastAPI(
+    title="Brewchemy API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     SessionMiddleware,
@@ -28,12 +56,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Cache"],
 )
 
 
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "passwordHashing": hash_pool.stats(),
+        "outbox": outbox_dispatcher.stats(),
+        "critiqueCache": critique_cache.stats(),
+    }
 
 
 # Routes
@@ -6,6 +6,7 @@ from typing import Optional
 
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy import (
+    BigInteger,
     Integer,
     String,
     Text,
@@ -14,23 +15,37 @@ from sqlalchemy import (
     Boolean,
     ForeignKey,
     Date,
+    Index,
     func,
+    text,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 
-from passlib.context import CryptContext
+from .security import hash_password, verify_password
 
 
 class Base(DeclarativeBase):
     pass
 
 
-pwd_ctx = CryptContext(
-    schemes=["argon2"],  # Argon2id
-    deprecated="auto",
-    argon2__memory_cost=65536,  # 64 MiB
-    argon2__time_cost=2,
-    argon2__parallelism=2,
-)
+def _updated_at():
+    # bumped by every UPDATE; the ETags of the read endpoints are built from it
+    return mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+
+def _trgm_index(table: str, column: str) -> Index:
+    # pg_trgm GIN index, serves ILIKE '%term%' and similarity()
+    return Index(
+        f"ix_{table}_{column}_trgm",
+        column,
+        postgresql_using="gin",
+        postgresql_ops={column: "gin_trgm_ops"},
+    )
 
 
 class User(Base):
@@ -67,11 +82,12 @@ class User(Base):
         lazy="joined",
     )
 
+    # blocking (Argon2); async handlers use security.*_password_async instead
     def set_password(self, password: str) -> None:
-        self.password_hash = pwd_ctx.hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password: str) -> bool:
-        return pwd_ctx.verify(password, self.password_hash)
+        return verify_password(password, self.password_hash)
 
     def to_dict(self) -> dict:
         return {
@@ -93,8 +109,15 @@ class User(Base):
 
 class Equipment(Base):
     __tablename__ = "equipments"
+    __table_args__ = (
+        Index("ix_equipments_user_id_official_id", "user_id", "official_id"),
+        _trgm_index("equipments", "name"),
+        _trgm_index("equipments", "description"),
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     official_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    updated_at: Mapped[datetime] = _updated_at()
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.user_id"), nullable=False, index=True
     )
@@ -118,8 +141,15 @@ class Equipment(Base):
 
 class Fermentable(Base):
     __tablename__ = "fermentables"
+    __table_args__ = (
+        Index("ix_fermentables_user_id_official_id", "user_id", "official_id"),
+        _trgm_index("fermentables", "name"),
+        _trgm_index("fermentables", "description"),
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     official_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    updated_at: Mapped[datetime] = _updated_at()
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.user_id"), nullable=False, index=True
     )
@@ -135,8 +165,15 @@ class Fermentable(Base):
 
 class Hop(Base):
     __tablename__ = "hops"
+    __table_args__ = (
+        Index("ix_hops_user_id_official_id", "user_id", "official_id"),
+        _trgm_index("hops", "name"),
+        _trgm_index("hops", "description"),
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     official_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    updated_at: Mapped[datetime] = _updated_at()
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.user_id"), nullable=False, index=True
     )
@@ -156,8 +193,15 @@ class Hop(Base):
 
 class Misc(Base):
     __tablename__ = "misc"
+    __table_args__ = (
+        Index("ix_misc_user_id_official_id", "user_id", "official_id"),
+        _trgm_index("misc", "name"),
+        _trgm_index("misc", "description"),
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     official_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    updated_at: Mapped[datetime] = _updated_at()
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.user_id"), nullable=False, index=True
     )
@@ -168,8 +212,15 @@ class Misc(Base):
 
 class Yeast(Base):
     __tablename__ = "yeasts"
+    __table_args__ = (
+        Index("ix_yeasts_user_id_official_id", "user_id", "official_id"),
+        _trgm_index("yeasts", "name"),
+        _trgm_index("yeasts", "description"),
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     official_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    updated_at: Mapped[datetime] = _updated_at()
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.user_id"), nullable=False, index=True
     )
@@ -201,6 +252,23 @@ class Recipe(Base):
     author: Mapped[str] = mapped_column(String(40), nullable=False)
     type: Mapped[str] = mapped_column(String(20), nullable=False)
 
+    # cached stats, recomputed when equipment/fermentables/hops/yeasts change
+    og: Mapped[float | None] = mapped_column(Numeric, nullable=True)
+    fg: Mapped[float | None] = mapped_column(Numeric, nullable=True)
+    abv: Mapped[float | None] = mapped_column(Numeric, nullable=True)
+    ibu: Mapped[float | None] = mapped_column(Numeric, nullable=True)
+    ebc: Mapped[float | None] = mapped_column(Numeric, nullable=True)
+    bu_gu: Mapped[float | None] = mapped_column(Numeric, nullable=True)
+    # also bumped when a child row changes (see services/recipe_writes)
+    updated_at: Mapped[datetime] = _updated_at()
+
+    __table_args__ = (
+        Index("ix_recipes_user_id_abv", "user_id", "abv"),
+        Index("ix_recipes_user_id_ibu", "user_id", "ibu"),
+        _trgm_index("recipes", "name"),
+        _trgm_index("recipes", "description"),
+    )
+
     recipe_equipment: Mapped["RecipeEquipment | None"] = relationship(
         back_populates="recipe",
         cascade="all, delete-orphan",
@@ -208,16 +276,28 @@ class Recipe(Base):
         lazy="selectin",
     )
     recipe_fermentables: Mapped[list["RecipeFermentable"]] = relationship(
-        back_populates="recipe", cascade="all, delete-orphan", lazy="selectin"
+        back_populates="recipe",
+        cascade="all, delete-orphan",
+        lazy="selectin",
+        order_by="RecipeFermentable.id",
     )
     recipe_hops: Mapped[list["RecipeHop"]] = relationship(
-        back_populates="recipe", cascade="all, delete-orphan", lazy="selectin"
+        back_populates="recipe",
+        cascade="all, delete-orphan",
+        lazy="selectin",
+        order_by="RecipeHop.id",
     )
     recipe_misc: Mapped[list["RecipeMisc"]] = relationship(
-        back_populates="recipe", cascade="all, delete-orphan", lazy="selectin"
+        back_populates="recipe",
+        cascade="all, delete-orphan",
+        lazy="selectin",
+        order_by="RecipeMisc.id",
     )
     recipe_yeasts: Mapped[list["RecipeYeast"]] = relationship(
-        back_populates="recipe", cascade="all, delete-orphan", lazy="selectin"
+        back_populates="recipe",
+        cascade="all, delete-orphan",
+        lazy="selectin",
+        order_by="RecipeYeast.id",
     )
 
 
@@ -322,3 +402,53 @@ class RecipeYeast(Base):
     description: Mapped[str | None] = mapped_column(Text)
     quantity: Mapped[float] = mapped_column(Numeric, nullable=False)
     recipe: Mapped["Recipe"] = relationship(back_populates="recipe_yeasts")
+
+
+class OutboxMessage(Base):
+    """
+    Side effect (e-mail...) to run after a commit, written in the same
+    transaction as the change that causes it; see services/outbox.py.
+    Sent rows are deleted; rows that keep failing stay with failed_at set.
+    """
+
+    __tablename__ = "outbox"
+    __table_args__ = (
+        # the dispatcher's "next pending rows" scan
+        Index(
+            "ix_outbox_pending",
+            "available_at",
+            "id",
+            postgresql_where=text("failed_at IS NULL"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    kind: Mapped[str] = mapped_column(String(30), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    # not picked up before this time (retry backoff)
+    available_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    attempts: Mapped[int] = mapped_column(Integer, server_default="0", nullable=False)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    failed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class CritiqueCacheEntry(Base):
+    """
+    AI critique of a recipe text, keyed by the hash of what was asked
+    (normalized message, model, system prompt); see services/critiques.py.
+    Rows older than CRITIQUE_CACHE_TTL_SECONDS are ignored and purged.
+    """
+
+    __tablename__ = "critique_cache"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+    response: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
+    )
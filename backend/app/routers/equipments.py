@@ -1,88 +1,71 @@
 # app/routers/equipments.py
-from datetime import datetime, timezone
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select, or_, and_, not_
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_db
 from ..models import Equipment
 from ..schemas.equipments import EquipmentCreate, EquipmentUpdate, EquipmentOut
+from ..services.catalog import CatalogService, official_cache
+from ..utils.etag import check_etag
 from .users import token_required
 
 router = APIRouter(prefix="/api/equipments", tags=["equipments"])
 
-ADMIN_ID = 1
-
-def _to_out(e: Equipment) -> EquipmentOut:
-    # Se estiver usando Pydantic v2, prefira model_validate(e) em vez de from_orm
-    return EquipmentOut.model_validate(e)
+service = CatalogService(
+    Equipment,
+    EquipmentOut,
+    label="Equipment",
+    cache=official_cache(),
+    copy_fields=(
+        "name",
+        "description",
+        "efficiency",
+        "batch_volume",
+        "batch_time",
+        "boil_time",
+        "boil_temperature",
+        "boil_off",
+        "trub_loss",
+        "dead_space",
+    ),
+)
+
+
+async def not_modified(
+    request: Request,
+    response: Response,
+    current_user_id: int = Depends(token_required),
+    db: AsyncSession = Depends(get_db),
+):
+    check_etag(request, response, *await service.version(db, current_user_id))
 
 
-@router.get("/search", response_model=List[EquipmentOut])
+@router.get("/search", response_model=List[EquipmentOut], dependencies=[Depends(not_modified)])
 async def search_equipments(
     searchTerm: str = Query(..., min_length=1),
     current_user_id: int = Depends(token_required),
     db: AsyncSession = Depends(get_db),
 ):
-    subq = (
-        select(Equipment.official_id)
-        .where(
-            Equipment.user_id == current_user_id,
-            Equipment.official_id.is_not(None),
-        )
-        .distinct()
-    )
-    sub_ids = (await db.execute(subq)).scalars().all()
-
-    stmt = (
-        select(Equipment)
-        .where(
-            and_(
-                or_(
-                    Equipment.user_id == current_user_id,
-                    and_(Equipment.user_id == ADMIN_ID, not_(Equipment.id.in_(sub_ids))),
-                ),
-                Equipment.name.ilike(f"%{searchTerm}%"),
-            )
-        )
-        .limit(12)
-    )
-    items = (await db.execute(stmt)).scalars().all()
-    return [_to_out(i) for i in items]
-
-
-@router.get("", response_model=List[EquipmentOut])
+    return await service.search(db, current_user_id, searchTerm)
+
+
+@router.get("", response_model=List[EquipmentOut], dependencies=[Depends(not_modified)])
 async def get_equipments(
     current_user_id: int = Depends(token_required),
     db: AsyncSession = Depends(get_db),
 ):
-    subq = (
-        select(Equipment.official_id)
-        .where(
-            Equipment.user_id == current_user_id,
-            Equipment.official_id.is_not(None),
-        )
-        .distinct()
-    )
-    sub_ids = (await db.execute(subq)).scalars().all()
-
-    stmt = (
-        select(Equipment)
-        .where(
-            or_(
-                Equipment.user_id == current_user_id,
-                and_(
-                    Equipment.user_id == ADMIN_ID,
-                    not_(Equipment.id.in_(sub_ids)),
-                ),
-            )
-        )
-        .limit(12)
-    )
-    items = (await db.execute(stmt)).scalars().all()
-    return [_to_out(i) for i in items]
+    return await service.list(db, current_user_id)
+
+
+@router.get("/batch", response_model=List[EquipmentOut])
+async def get_equipments_batch(
+    ids: List[int] = Query(..., min_length=1, max_length=100),
+    current_user_id: int = Depends(token_required),
+    db: AsyncSession = Depends(get_db),
+):
+    return await service.get_many(db, ids, current_user_id)
 
 
 @router.get("/{id:int}", response_model=EquipmentOut)
@@ -91,19 +74,7 @@ async def get_equipment(
     current_user_id: int = Depends(token_required),
     db: AsyncSession = Depends(get_db),
 ):
-    item = (await db.execute(
-        select(Equipment).where(Equipment.id == id, Equipment.user_id == current_user_id)
-    )).scalar_one_or_none()
-
-    if not item:
-        item = (await db.execute(
-            select(Equipment).where(Equipment.id == id, Equipment.user_id == ADMIN_ID)
-        )).scalar_one_or_none()
-
-    if not item:
-        raise HTTPException(status_code=404, detail="Equipment not found")
-
-    return _to_out(item)
+    return await service.get(db, id, current_user_id)
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=EquipmentOut)
@@ -112,17 +83,7 @@ async def add_equipment(
     current_user_id: int = Depends(token_required),
     db: AsyncSession = Depends(get_db),
 ):
-    data = payload.model_dump(by_alias=False)
-
-    new_item = Equipment(
-        user_id=current_user_id,
-        **data,
-        created_at=datetime.utcnow(),
-    )
-    db.add(new_item)
-    await db.commit()
-    await db.refresh(new_item)
-    return _to_out(new_item)
+    return await service.create(db, current_user_id, payload)
 
 
 @router.put("/{id:int}", response_model=EquipmentOut)
@@ -132,51 +93,7 @@ async def update_equipment(
     current_user_id: int = Depends(token_required),
     db: AsyncSession = Depends(get_db),
 ):
-    data = payload.model_dump(exclude_unset=True, by_alias=False)
-    data.pop("itemUserId", None)
-
-    # find by id
-    item = (await db.execute(
-        select(Equipment).where(Equipment.id == id)
-    )).scalar_one_or_none()
-    if not item:
-        raise HTTPException(status_code=404, detail="Equipment not found")
-
-    # logged user then apply
-    if item.user_id == current_user_id:
-        for field, value in data.items():
-            setattr(item, field, value)
-        await db.commit()
-        await db.refresh(item)
-        return _to_out(item)
-
-    # admin user
-    if item.user_id == ADMIN_ID:
-        new_item = Equipment(
-            user_id=current_user_id,
-            official_id=item.id,
-            name=item.name,
-            description=item.description,
-            efficiency=item.efficiency,
-            batch_volume=item.batch_volume,
-            batch_time=item.batch_time,
-            boil_time=item.boil_time,
-            boil_temperature=item.boil_temperature,
-            boil_off=item.boil_off,
-            trub_loss=item.trub_loss,
-            dead_space=item.dead_space,
-            created_at=datetime.utcnow(),
-        )
-        for field, value in data.items():
-            setattr(new_item, field, value)
-
-        db.add(new_item)
-        await db.commit()
-        await db.refresh(new_item)
-        return _to_out(new_item)
-
-    # another user
-    raise HTTPException(status_code=404, detail="Equipment not found")
+    return await service.update(db, id, current_user_id, payload)
 
 
 @router.delete("/{id:int}")
@@ -185,18 +102,4 @@ async def delete_equipment(
     current_user_id: int = Depends(token_required),
     db: AsyncSession = Depends(get_db),
 ):
-    item = (await db.execute(
-        select(Equipment).where(Equipment.id == id)
-    )).scalar_one_or_none()
-    if not item:
-        raise HTTPException(status_code=404, detail="Equipment not found")
-
-    if item.user_id == 1 and current_user_id != ADMIN_ID:
-        raise HTTPException(status_code=404, detail="Cannot delete official record")
-
-    if item.user_id != current_user_id:
-        raise HTTPException(status_code=404, detail="Equipment not found")
-
-    await db.delete(item)
-    await db.commit()
-    return {"message": f"Equipment with ID {id} was successfully deleted"}
+    return await service.delete(db, id, current_user_id)
@@ -1,89 +1,70 @@
 # app/routers/fermentables.py
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select, or_, and_, not_
+
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_db
 from ..models import Fermentable
 from ..schemas.fermentables import FermentableCreate, FermentableUpdate, FermentableOut
+from ..services.catalog import CatalogService, official_cache
+from ..utils.etag import check_etag
 from .users import token_required
 
 router = APIRouter(prefix="/api/fermentables", tags=["fermentables"])
 
-ADMIN_ID = 1
-
-
-def _to_out(x: Fermentable) -> FermentableOut:
-    return FermentableOut.model_validate(x)
+service = CatalogService(
+    Fermentable,
+    FermentableOut,
+    label="Fermentable",
+    cache=official_cache(),
+    copy_fields=(
+        "name",
+        "description",
+        "ebc",
+        "potential_extract",
+        "type",
+        "supplier",
+    ),
+    blank_to_none=(
+        "ebc",
+    ),
+)
+
+
+async def not_modified(
+    request: Request,
+    response: Response,
+    current_user_id: int = Depends(token_required),
+    db: AsyncSession = Depends(get_db),
+):
+    check_etag(request, response, *await service.version(db, current_user_id))
 
 
-@router.get("/search", response_model=List[FermentableOut])
+@router.get("/search", response_model=List[FermentableOut], dependencies=[Depends(not_modified)])
 async def search_fermentables(
     searchTerm: str = Query(..., min_length=1),
     current_user_id: int = Depends(token_required),
     db: AsyncSession = Depends(get_db),
 ):
-    subq = (
-        select(Fermentable.official_id)
-        .where(
-            Fermentable.user_id == current_user_id,
-            Fermentable.official_id.is_not(None),
-        )
-        .distinct()
-    )
-    sub_ids = (await db.execute(subq)).scalars().all()
-
-    stmt = (
-        select(Fermentable)
-        .where(
-            and_(
-                or_(
-                    Fermentable.user_id == current_user_id,
-                    and_(
-                        Fermentable.user_id == ADMIN_ID,
-                        not_(Fermentable.id.in_(sub_ids)),
-                    ),
-                ),
-                Fermentable.name.ilike(f"%{searchTerm}%"),
-            )
-        )
-        .limit(12)
-    )
-    items = (await db.execute(stmt)).scalars().all()
-    return [_to_out(i) for i in items]
-
-
-@router.get("", response_model=List[FermentableOut])
+    return await service.search(db, current_user_id, searchTerm)
+
+
+@router.get("", response_model=List[FermentableOut], dependencies=[Depends(not_modified)])
 async def get_fermentables(
     current_user_id: int = Depends(token_required),
     db: AsyncSession = Depends(get_db),
 ):
-    subq = (
-        select(Fermentable.official_id)
-        .where(
-            Fermentable.user_id == current_user_id,
-            Fermentable.official_id.is_not(None),
-        )
-        .distinct()
-    )
-    sub_ids = (await db.execute(subq)).scalars().all()
-
-    stmt = (
-        select(Fermentable)
-        .where(
-            or_(
-                Fermentable.user_id == current_user_id,
-                and_(
-                    Fermentable.user_id == ADMIN_ID,
-                    not_(Fermentable.id.in_(sub_ids)),
-                ),
-            )
-        )
-        .limit(12)
-    )
-    items = (await db.execute(stmt)).scalars().all()
-    return [_to_out(i) for i in items]
+    return await service.list(db, current_user_id)
+
+
+@router.get("/batch", response_model=List[FermentableOut])
+async def get_fermentables_batch(
+    ids: List[int] = Query(..., min_length=1, max_length=100),
+    current_user_id: int = Depends(token_required),
+    db: AsyncSession = Depends(get_db),
+):
+    return await service.get_many(db, ids, current_user_id)
 
 
 @router.get("/{id:int}", response_model=FermentableOut)
@@ -92,18 +73,7 @@ async def get_fermentable(
     current_user_id: int = Depends(token_required),
     db: AsyncSession = Depends(get_db),
 ):
-    item = (await db.execute(
-        select(Fermentable).where(
-            Fermentable.id == id,
-            or_(
-                Fermentable.user_id == current_user_id,
-                Fermentable.user_id == ADMIN_ID,
-            ),
-        )
-    )).scalar_one_or_none()
-    if not item:
-        raise HTTPException(status_code=404, detail="Fermentable not found")
-    return _to_out(item)
+    return await service.get(db, id, current_user_id)
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=FermentableOut)
@@ -112,18 +82,7 @@ async def add_fermentable(
     current_user_id: int = Depends(token_required),
     db: AsyncSession = Depends(get_db),
 ):
-    data = payload.model_dump(by_alias=False)
-    if isinstance(data.get("ebc"), str) and data["ebc"] == "":
-        data["ebc"] = None
-
-    new_item = Fermentable(
-        user_id=current_user_id,
-        **data,
-    )
-    db.add(new_item)
-    await db.commit()
-    await db.refresh(new_item)
-    return _to_out(new_item)
+    return await service.create(db, current_user_id, payload)
 
 
 @router.put("/{id:int}", response_model=FermentableOut)
@@ -133,43 +92,7 @@ async def update_fermentable(
     current_user_id: int = Depends(token_required),
     db: AsyncSession = Depends(get_db),
 ):
-    data = payload.model_dump(exclude_unset=True, by_alias=False)
-    data.pop("itemUserId", None)
-
-    item = (await db.execute(
-        select(Fermentable).where(Fermentable.id == id)
-    )).scalar_one_or_none()
-
-    if not item:
-        raise HTTPException(status_code=404, detail="Fermentable not found")
-
-    if item.user_id == current_user_id:
-        for field, value in data.items():
-            setattr(item, field, value)
-        await db.commit()
-        await db.refresh(item)
-        return _to_out(item)
-
-    if item.user_id == ADMIN_ID:
-        new_item = Fermentable(
-            user_id=current_user_id,
-            official_id=item.id,
-            name=item.name,
-            description=item.description,
-            ebc=item.ebc,
-            potential_extract=item.potential_extract,
-            type=item.type,
-            supplier=item.supplier,
-        )
-        for field, value in data.items():
-            setattr(new_item, field, value)
-
-        db.add(new_item)
-        await db.commit()
-        await db.refresh(new_item)
-        return _to_out(new_item)
-
-    raise HTTPException(status_code=404, detail="Fermentable not found")
+    return await service.update(db, id, current_user_id, payload)
 
 
 @router.delete("/{id:int}")
@@ -178,19 +101,4 @@ async def delete_fermentable(
     current_user_id: int = Depends(token_required),
     db: AsyncSession = Depends(get_db),
 ):
-    item = (await db.execute(
-        select(Fermentable).where(Fermentable.id == id)
-    )).scalar_one_or_none()
-
-    if not item:
-        raise HTTPException(status_code=404, detail="Fermentable not found")
-
-    if item.user_id == 1 and current_user_id != ADMIN_ID:
-        raise HTTPException(status_code=404, detail="Cannot delete official record")
-
-    if item.user_id != current_user_id:
-        raise HTTPException(status_code=404, detail="Fermentable not found")
-
-    await db.delete(item)
-    await db.commit()
-    return {"message": f"Fermentable with ID {id} was successfully deleted"}
+    return await service.delete(db, id, current_user_id)
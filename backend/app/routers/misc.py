@@ -1,75 +1,65 @@
 # app/routers/miscs.py
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select, or_, and_, not_
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_db
 from ..models import Misc
 from ..schemas.misc import MiscCreate, MiscUpdate, MiscOut
+from ..services.catalog import CatalogService, official_cache
+from ..utils.etag import check_etag
 from .users import token_required
 
 router = APIRouter(prefix="/api/miscs", tags=["miscs"])
 
-ADMIN_ID = 1
+service = CatalogService(
+    Misc,
+    MiscOut,
+    label="Misc item",
+    cache=official_cache(),
+    copy_fields=(
+        "name",
+        "description",
+        "type",
+    ),
+)
+
+
+async def not_modified(
+    request: Request,
+    response: Response,
+    current_user_id: int = Depends(token_required),
+    db: AsyncSession = Depends(get_db),
+):
+    check_etag(request, response, *await service.version(db, current_user_id))
 
-def _to_out(x: Misc) -> MiscOut:
-    return MiscOut.model_validate(x)
 
-@router.get("/search", response_model=List[MiscOut])
+@router.get("/search", response_model=List[MiscOut], dependencies=[Depends(not_modified)])
 async def search_miscs(
     searchTerm: str = Query(..., min_length=1),
     current_user_id: int = Depends(token_required),
     db: AsyncSession = Depends(get_db),
 ):
-    subq = (
-        select(Misc.official_id)
-        .where(Misc.user_id == current_user_id, Misc.official_id.is_not(None))
-        .distinct()
-    )
-    sub_ids = (await db.execute(subq)).scalars().all()
-
-    stmt = (
-        select(Misc)
-        .where(
-            and_(
-                or_(
-                    Misc.user_id == current_user_id,
-                    and_(Misc.user_id == ADMIN_ID, not_(Misc.id.in_(sub_ids))),
-                ),
-                Misc.name.ilike(f"%{searchTerm}%"),
-            )
-        )
-        .limit(12)
-    )
-    items = (await db.execute(stmt)).scalars().all()
-    return [_to_out(i) for i in items]
-
-@router.get("", response_model=List[MiscOut])
+    return await service.search(db, current_user_id, searchTerm)
+
+
+@router.get("", response_model=List[MiscOut], dependencies=[Depends(not_modified)])
 async def get_miscs(
     current_user_id: int = Depends(token_required),
     db: AsyncSession = Depends(get_db),
 ):
-    subq = (
-        select(Misc.official_id)
-        .where(Misc.user_id == current_user_id, Misc.official_id.is_not(None))
-        .distinct()
-    )
-    sub_ids = (await db.execute(subq)).scalars().all()
-
-    stmt = (
-        select(Misc)
-        .where(
-            or_(
-                Misc.user_id == current_user_id,
-                and_(Misc.user_id == ADMIN_ID, not_(Misc.id.in_(sub_ids))),
-            )
-        )
-        .limit(12)
-    )
-    items = (await db.execute(stmt)).scalars().all()
-    return [_to_out(i) for i in items]
+    return await service.list(db, current_user_id)
+
+
+@router.get("/batch", response_model=List[MiscOut])
+async def get_miscs_batch(
+    ids: List[int] = Query(..., min_length=1, max_length=100),
+    current_user_id: int = Depends(token_required),
+    db: AsyncSession = Depends(get_db),
+):
+    return await service.get_many(db, ids, current_user_id)
+
 
 @router.get("/{id:int}", response_model=MiscOut)
 async def get_misc(
@@ -77,19 +67,8 @@ async def get_misc(
     current_user_id: int = Depends(token_required),
     db: AsyncSession = Depends(get_db),
 ):
-    item = (await db.execute(
-        select(Misc).where(Misc.id == id, Misc.user_id == current_user_id)
-    )).scalar_one_or_none()
-
-    if not item:
-        item = (await db.execute(
-            select(Misc).where(Misc.id == id, Misc.user_id == ADMIN_ID)
-        )).scalar_one_or_none()
+    return await service.get(db, id, current_user_id)
 
-    if not item:
-        raise HTTPException(status_code=404, detail="Misc item not found")
-
-    return _to_out(item)
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=MiscOut)
 async def add_misc_item(
@@ -97,16 +76,8 @@ async def add_misc_item(
     current_user_id: int = Depends(token_required),
     db: AsyncSession = Depends(get_db),
 ):
-    new_item = Misc(
-        user_id=current_user_id,
-        name=payload.name,
-        description=payload.description,
-        type=payload.type,
-    )
-    db.add(new_item)
-    await db.commit()
-    await db.refresh(new_item)
-    return _to_out(new_item)
+    return await service.create(db, current_user_id, payload)
+
 
 @router.put("/{id:int}", response_model=MiscOut)
 async def update_misc(
@@ -115,39 +86,8 @@ async def update_misc(
     current_user_id: int = Depends(token_required),
     db: AsyncSession = Depends(get_db),
 ):
-    data = payload.model_dump(exclude_unset=True, by_alias=False)
-    data.pop("itemUserId", None)
-
-    item = (await db.execute(
-        select(Misc).where(Misc.id == id)
-    )).scalar_one_or_none()
-    if not item:
-        raise HTTPException(status_code=404, detail="Misc item not found")
-
-    if item.user_id == current_user_id:
-        for field, value in data.items():
-            setattr(item, field, value)
-        await db.commit()
-        await db.refresh(item)
-        return _to_out(item)
-
-    if item.user_id == ADMIN_ID:
-        new_item = Misc(
-            user_id=current_user_id,
-            official_id=item.id,
-            name=item.name,
-            description=item.description,
-            type=item.type,
-        )
-        for field, value in data.items():
-            setattr(new_item, field, value)
-
-        db.add(new_item)
-        await db.commit()
-        await db.refresh(new_item)
-        return _to_out(new_item)
-
-    raise HTTPException(status_code=404, detail="Misc item not found")
+    return await service.update(db, id, current_user_id, payload)
+
 
 @router.delete("/{id:int}")
 async def delete_misc_item(
@@ -155,18 +95,4 @@ async def delete_misc_item(
     current_user_id: int = Depends(token_required),
     db: AsyncSession = Depends(get_db),
 ):
-    item = (await db.execute(
-        select(Misc).where(Misc.id == id)
-    )).scalar_one_or_none()
-    if not item:
-        raise HTTPException(status_code=404, detail="Misc item not found")
-
-    if item.user_id == 1 and current_user_id != ADMIN_ID:
-        raise HTTPException(status_code=404, detail="Cannot delete official record")
-
-    if item.user_id != current_user_id:
-        raise HTTPException(status_code=404, detail="Misc item not found")
-
-    await db.delete(item)
-    await db.commit()
-    return {"message": f"Misc item with ID {id} was successfully deleted"}
+    return await service.delete(db, id, current_user_id)
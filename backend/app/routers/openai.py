@@ -1,12 +1,19 @@
 # app/routers/openai.py
-from fastapi import APIRouter, Depends, HTTPException
+from typing import AsyncIterator
+
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from .users import token_required
 from ..config import settings
+from ..services.critiques import SYSTEM_PROMPT, critique_cache
+from ..services.openai_client import openai_client
+from ..utils import sse
 
 from dotenv import load_dotenv
-from openai import AsyncOpenAI, APIConnectionError, APIStatusError
+from openai import AsyncOpenAI, AsyncStream, APIConnectionError, APIStatusError
 
 router = APIRouter(prefix="/api/openAI", tags=["openAI"])
 
@@ -16,42 +23,105 @@ class RecipeMessage(BaseModel):
     message: str
 
 class ChatGPTAsync:
-    def __init__(self, api_key: str | None):
-        self.client = AsyncOpenAI(api_key=api_key)
+    def __init__(self, client: AsyncOpenAI):
+        self.client = client
 
-    async def get_response(self, message: str, model: str) -> str:
+    async def _create(self, message: str, model: str, **kwargs):
         try:
-            resp = await self.client.chat.completions.create(
+            return await self.client.chat.completions.create(
                 model=model,
                 messages=[
-                    {
-                        "role": "system",
-                        "content": "You will objectively critique the recipe in three lines.",
-                    },
+                    {"role": "system", "content": SYSTEM_PROMPT},
                     {"role": "user", "content": message},
                 ],
+                **kwargs,
             )
-            return resp.choices[0].message.content or ""
         except (APIConnectionError, APIStatusError) as e:
             raise HTTPException(status_code=502, detail=f"{e}") from e
         except Exception as e:
             raise HTTPException(status_code=502, detail=f"Unexpected error calling OpenAI: {e}") from e
 
+    async def get_response(self, message: str, model: str) -> str:
+        resp = await self._create(message, model)
+        return resp.choices[0].message.content or ""
+
+    async def open_stream(self, message: str, model: str) -> AsyncStream:
+        """
+        Starts a streamed completion. Errors up to the API's response headers
+        still raise the usual 502 here, before the endpoint sends anything.
+        """
+        return await self._create(message, model, stream=True)
+
+
+async def stream_critique(stream: AsyncStream, message: str, model: str) -> AsyncIterator[str]:
+    """
+    Forwards the completion as SSE: one ``{"delta": ...}`` event per token
+    chunk, then ``event: done`` with the whole critique (which is cached), or
+    ``event: error`` when the API fails midway.
+
+    When the client disconnects Starlette cancels this generator; closing the
+    stream then drops the upstream connection, so the API stops generating.
+    """
+    parts = []
+    try:
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                yield sse.sse_event({"delta": delta})
+    except Exception as e:
+        yield sse.sse_event({"detail": f"Error calling OpenAI: {e}"}, event="error")
+        return
+    finally:
+        with anyio.CancelScope(shield=True):
+            await stream.close()
+
+    critique = "".join(parts)
+    await critique_cache.put(message, model, critique)
+    yield sse.sse_event({"response": critique}, event="done")
+
+
+async def stream_cached(critique: str) -> AsyncIterator[str]:
+    yield sse.sse_event({"delta": critique})
+    yield sse.sse_event({"response": critique}, event="done")
+
 
 @router.post("")
 async def openai_endpoint(
     payload: RecipeMessage,
+    request: Request,
+    response: Response,
+    stream: bool = Query(False),
     current_user_id: int = Depends(token_required),
 ):
+    """
+    Critique of the recipe in ``message``: ``{"response": ...}``, or, with
+    ``?stream=true`` or ``Accept: text/event-stream``, the same critique as
+    Server-Sent Events while it is generated (see stream_critique).
+    """
     if not payload.message:
         raise HTTPException(status_code=400, detail="No recipe provided")
 
-    api_key = settings.OPENAI_API_KEY
-    if not api_key:
+    if not openai_client.configured():
         raise HTTPException(status_code=500, detail="OPENAI_API_KEY not configured")
 
-    model = "gpt-3.5-turbo"
+    # shared client: the connections to the API stay open between requests
+    chatgpt = ChatGPTAsync(openai_client.get())
+    model = settings.OPENAI_MODEL
+
+    if stream or sse.MEDIA_TYPE in request.headers.get("accept", ""):
+        cached = await critique_cache.get(payload.message, model)
+        if cached is not None:
+            body, hit = stream_cached(cached), "hit"
+        else:
+            upstream = await chatgpt.open_stream(payload.message, model)
+            body, hit = stream_critique(upstream, payload.message, model), "miss"
+        return StreamingResponse(
+            body, media_type=sse.MEDIA_TYPE, headers={**sse.HEADERS, "X-Cache": hit}
+        )
 
-    chatgpt = ChatGPTAsync(api_key=api_key)
-    chat_response = await chatgpt.get_response(payload.message, model=model)
+    chat_response, hit = await critique_cache.get_or_create(
+        payload.message, model, lambda: chatgpt.get_response(payload.message, model=model)
+    )
+    response.headers["X-Cache"] = "hit" if hit else "miss"
     return {"response": chat_response}
@@ -1,8 +1,8 @@
 # app/routers/users.py
 from datetime import datetime, timedelta
+import hashlib
 import random
-import smtplib
-from email.message import EmailMessage
+import time
 
 from fastapi import (
     APIRouter,
@@ -15,19 +15,26 @@ from fastapi import (
     Request,
 )
 from fastapi.responses import JSONResponse, RedirectResponse
-from jose import jwt, JWTError, ExpiredSignatureError
 from pydantic import BaseModel, EmailStr, Field, AliasChoices
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from requests_oauthlib import OAuth2Session
 from starlette.concurrency import run_in_threadpool
 
 from ..config import settings
-from ..database import get_db
+from ..database import get_db, session_scope
 from ..models import User
 from ..schemas.users import CreateUserIn, LoginIn, UserOut
-from ..security import verify_password, hash_password
-from ..utils.jwt import make_access_token
+from ..services.outbox import add_email
+from ..security import hash_password_async, needs_rehash, verify_password_async
+from ..utils.cache import TTLCache
+from ..utils.jwt import (
+    InvalidTokenError,
+    TokenExpiredError,
+    decode_token,
+    encode_token,
+    make_access_token,
+)
 
 import logging
 logger = logging.getLogger("brewchemy")
@@ -35,23 +42,41 @@ logger = logging.getLogger("brewchemy")
 router = APIRouter(prefix="/api/users", tags=["users"])
 
 
-def token_required(authorization: str | None = Header(None)) -> int:
+def _auth_cache(ttl: int) -> TTLCache | None:
+    return TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=ttl) if ttl > 0 else None
+
+
+# sha256(token) -> user_id of tokens already verified
+_token_cache = _auth_cache(settings.TOKEN_CACHE_TTL_SECONDS)
+# user_id -> active User (detached, read-only)
+_user_cache = _auth_cache(settings.USER_CACHE_TTL_SECONDS)
+
+
+def forget_user(user_id: int) -> None:
+    if _user_cache is not None:
+        _user_cache.invalidate(user_id)
+
+
+async def token_required(authorization: str | None = Header(None)) -> int:
+    # async: no thread pool hop per request, and the caches are only
+    # touched from the event loop
     if not authorization or not authorization.lower().startswith("bearer "):
         raise HTTPException(
             status_code=401, detail="Missing or invalid Authorization header"
         )
 
     token = authorization.split(" ", 1)[1].strip()
+    digest = hashlib.sha256(token.encode()).digest()
+    if _token_cache is not None:
+        user_id = _token_cache.get(digest)
+        if user_id is not None:
+            return user_id
+
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET,
-            algorithms=[settings.JWT_ALG],
-            options={"verify_aud": False},
-        )
-    except ExpiredSignatureError:
+        payload = decode_token(token)
+    except TokenExpiredError:
         raise HTTPException(status_code=401, detail="Token has expired")
-    except JWTError:
+    except InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
     if payload.get("typ") != "access" or payload.get("iss") != "brewchemy":
@@ -61,7 +86,13 @@ def token_required(authorization: str | None = Header(None)) -> int:
     if not sub or not sub.isdigit():
         raise HTTPException(status_code=401, detail="Invalid token subject")
 
-    return int(sub)
+    user_id = int(sub)
+    if _token_cache is not None:
+        exp = payload.get("exp")
+        ttl = exp - time.time() if exp is not None else None
+        if ttl is None or ttl > 0:
+            _token_cache.set(digest, user_id, ttl=ttl)
+    return user_id
 
 
 class MeOut(BaseModel):
@@ -81,11 +112,20 @@ async def get_current_user(
     user_id: int = Depends(token_required),
     db: AsyncSession = Depends(get_db),
 ) -> User:
+    if _user_cache is not None:
+        user = _user_cache.get(user_id)
+        if user is not None:
+            return user
+
     user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if getattr(user, "status", "active") != "active":
         raise HTTPException(status_code=403, detail="User is not active")
+
+    if _user_cache is not None:
+        db.expunge(user)
+        _user_cache.set(user_id, user)
     return user
 
 
@@ -188,8 +228,27 @@ async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
     )
 
 
+async def rehash_password(user_id: int, password: str, old_hash: str) -> None:
+    """
+    Re-hashes with the current Argon2 costs after a successful login. Only
+    replaces the hash that was verified, never a password changed meanwhile.
+    """
+    try:
+        new_hash = await hash_password_async(password)
+        async with session_scope() as db:
+            await db.execute(
+                update(User)
+                .where(User.user_id == user_id, User.password_hash == old_hash)
+                .values(password_hash=new_hash)
+            )
+    except Exception:
+        logger.exception("Password rehash failed for user %s", user_id)
+
+
 @router.post("/login")
-async def login(payload: LoginIn, db: AsyncSession = Depends(get_db)):
+async def login(
+    payload: LoginIn, background: BackgroundTasks, db: AsyncSession = Depends(get_db)
+):
     if not payload.email or not payload.password:
         raise HTTPException(status_code=400, detail="Email and password are required")
 
@@ -200,10 +259,13 @@ async def login(payload: LoginIn, db: AsyncSession = Depends(get_db)):
     if (
         not user
         or user.status != "active"
-        or not verify_password(payload.password, user.password_hash)
+        or not await verify_password_async(payload.password, user.password_hash)
     ):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    if needs_rehash(user.password_hash):
+        background.add_task(rehash_password, user.user_id, payload.password, user.password_hash)
+
     user.last_login = datetime.utcnow()
     await db.commit()
 
@@ -225,16 +287,14 @@ def get_user_me(current_user: User = Depends(get_current_user)):
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=UserOut)
-async def create_user(
-    payload: CreateUserIn, background: BackgroundTasks, db: AsyncSession = Depends(get_db)
-):
+async def create_user(payload: CreateUserIn, db: AsyncSession = Depends(get_db)):
     existing_user = (await db.execute(
         select(User).where(User.email == payload.email)
     )).scalar_one_or_none()
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered.")
 
-    pwd_hash = hash_password(payload.password)
+    pwd_hash = await hash_password_async(payload.password)
 
     new_user = User(
         user_id=random.randint(1, 1_000_000),
@@ -246,11 +306,10 @@ async def create_user(
     )
 
     db.add(new_user)
+    send_confirmation_email(db, new_user)
     await db.commit()
     await db.refresh(new_user)
 
-    background.add_task(send_confirmation_email, new_user)
-
     return UserOut.model_validate(new_user)
 
 
@@ -290,6 +349,7 @@ async def patch_preferences(
 
     await db.commit()
     await db.refresh(user)
+    forget_user(user.user_id)
     return UserOut.model_validate(user)
 
 
@@ -303,67 +363,26 @@ async def delete_user(user_id: int, db: AsyncSession = Depends(get_db)):
 
     await db.delete(user)
     await db.commit()
+    forget_user(user_id)
     return {"message": f"User {user_id} deleted successfully"}
 
 
-def send_confirmation_email(user) -> bool:
+def send_confirmation_email(db: AsyncSession, user) -> bool:
+    """Queued in the outbox of ``db``'s transaction: sent once it commits."""
     if not getattr(settings, "EMAIL_ENABLED", True):
         print("[email] EMAIL_ENABLED=False; pulando envio.")
         return False
 
-    required = [settings.MAIL_SERVER, settings.MAIL_PORT, settings.MAIL_DEFAULT_SENDER]
-    if not all(required):
-        print(
-            "[email] Config incompleta: MAIL_SERVER/MAIL_PORT/MAIL_DEFAULT_SENDER ausentes."
-        )
-        return False
-
-    try:
-        msg = EmailMessage()
-        msg["Subject"] = "Registration Confirmation"
-        msg["From"] = settings.MAIL_DEFAULT_SENDER
-        msg["To"] = user.email
-        msg.set_content(
-            f"Hello {user.name},\n\n"
-            f"Click the link below to confirm your registration:\n"
-            f"{settings.BACKEND_URL}/api/users/confirm?email={user.email}\n\n"
-            "If you did not request this registration, please ignore this email.\n\n"
-            "Best regards,\nThe Brewchemy Team"
-        )
-
-        use_tls = bool(getattr(settings, "MAIL_USE_TLS", True))
-        server_host = settings.MAIL_SERVER
-        server_port = int(settings.MAIL_PORT)
-
-        if server_port == 465:
-            print(f"[email] Conectando via SMTP_SSL {server_host}:{server_port}")
-            server = smtplib.SMTP_SSL(server_host, server_port, timeout=15)
-        else:
-            print(f"[email] Conectando via SMTP {server_host}:{server_port}")
-            server = smtplib.SMTP(server_host, server_port, timeout=15)
-
-        try:
-            server.set_debuglevel(1)
-            if server_port != 465 and use_tls:
-                print("[email] Iniciando STARTTLS...")
-                server.starttls()
-
-            if getattr(settings, "MAIL_USERNAME", None) and getattr(
-                settings, "MAIL_PASSWORD", None
-            ):
-                print(f"[email] Autenticando como {settings.MAIL_USERNAME!r}")
-                server.login(settings.MAIL_USERNAME, settings.MAIL_PASSWORD)
-
-            print("[email] Enviando mensagem...")
-            server.send_message(msg)
-            print("[email] OK")
-            return True
-        finally:
-            server.quit()
-
-    except Exception as e:
-        print(f"[email] Falha ao enviar: {type(e).__name__}: {e}")
-        return False
+    return add_email(
+        db,
+        user.email,
+        "Registration Confirmation",
+        f"Hello {user.name},\n\n"
+        f"Click the link below to confirm your registration:\n"
+        f"{settings.BACKEND_URL}/api/users/confirm?email={user.email}\n\n"
+        "If you did not request this registration, please ignore this email.\n\n"
+        "Best regards,\nThe Brewchemy Team",
+    )
 
 
 @router.get("/confirm")
@@ -403,9 +422,7 @@ async def change_password(payload: ChangePasswordIn, db: AsyncSession = Depends(
         raise HTTPException(status_code=400, detail="Token is required")
 
     try:
-        decoded = jwt.decode(
-            payload.token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG]
-        )
+        decoded = decode_token(payload.token)
         if decoded.get("typ") != "pwd_reset" or decoded.get("iss") != "brewchemy":
             print("Invalid token type")
             raise HTTPException(status_code=400, detail="Invalid token type")
@@ -421,14 +438,14 @@ async def change_password(payload: ChangePasswordIn, db: AsyncSession = Depends(
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
-        user.password_hash = hash_password(payload.password)
+        user.password_hash = await hash_password_async(payload.password)
         await db.commit()
         return {"message": "Password changed successfully"}
 
-    except ExpiredSignatureError:
+    except TokenExpiredError:
         print("ExpiredSignatureError")
         raise HTTPException(status_code=400, detail="Token has expired")
-    except JWTError:
+    except InvalidTokenError:
         print("JWTError")
         raise HTTPException(status_code=400, detail="Invalid token")
 
@@ -440,7 +457,6 @@ class PasswordResetRequest(BaseModel):
 @router.post("/sendPasswordResetEmail")
 async def send_password_reset_email(
     payload: PasswordResetRequest,
-    background: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     email = payload.email
@@ -453,51 +469,28 @@ async def send_password_reset_email(
 
     try:
         now = datetime.utcnow()
-        token = jwt.encode(
+        token = encode_token(
             {
                 "sub": email,
                 "typ": "pwd_reset",
                 "iat": int(now.timestamp()),
                 "exp": int((now + timedelta(hours=1)).timestamp()),
-            },
-            settings.JWT_SECRET,
-            algorithm=settings.JWT_ALG,
+            }
         )
 
         reset_link = f"{settings.FRONTEND_URL}/ChangePassword?token={token}"
 
-        def send_email():
-            msg = EmailMessage()
-            msg["Subject"] = "Change Password"
-            msg["From"] = settings.MAIL_DEFAULT_SENDER
-            msg["To"] = email
-            msg.set_content(
-                "Click the link below to reset your password:\n"
-                f"{reset_link}\n\n"
-                "If you did not request this, please ignore this email.\n\n"
-                "Best regards,\nThe Brewchemy Team"
-            )
-
-            use_tls = bool(getattr(settings, "MAIL_USE_TLS", True))
-            server_port = int(settings.MAIL_PORT)
-
-            if server_port == 465:
-                server = smtplib.SMTP_SSL(settings.MAIL_SERVER, server_port, timeout=15)
-            else:
-                server = smtplib.SMTP(settings.MAIL_SERVER, server_port, timeout=15)
-
-            try:
-                if server_port != 465 and use_tls:
-                    server.starttls()
-                if getattr(settings, "MAIL_USERNAME", None) and getattr(
-                    settings, "MAIL_PASSWORD", None
-                ):
-                    server.login(settings.MAIL_USERNAME, settings.MAIL_PASSWORD)
-                server.send_message(msg)
-            finally:
-                server.quit()
-
-        background.add_task(send_email)
+        if not add_email(
+            db,
+            email,
+            "Change Password",
+            "Click the link below to reset your password:\n"
+            f"{reset_link}\n\n"
+            "If you did not request this, please ignore this email.\n\n"
+            "Best regards,\nThe Brewchemy Team",
+        ):
+            raise RuntimeError("mail not queued")
+        await db.commit()
 
         return {"message": "Email sent successfully"}
 
@@ -343,6 +343,13 @@ class RecipeOut(BaseModel):
     author: str
     type: str
 
+    og: Optional[float] = None
+    fg: Optional[float] = None
+    abv: Optional[float] = None
+    ibu: Optional[float] = None
+    ebc: Optional[float] = None
+    bu_gu: Optional[float] = Field(default=None, serialization_alias="buGu")
+
     recipe_equipment: Optional[RecipeEquipmentOut] = Field(
         default=None, serialization_alias="recipeEquipment"
     )
@@ -360,3 +367,156 @@ class RecipeOut(BaseModel):
     )
 
     model_config = {"from_attributes": True}
+
+
+class RecipeSummaryOut(BaseModel):
+    """RecipeOut without the child collections, for list pages."""
+
+    id: int
+    user_id: int = Field(serialization_alias="userId")
+    name: str
+    style: Optional[str] = None
+    creation_date: Optional[date] = Field(
+        default=None, serialization_alias="creationDate"
+    )
+    author: str
+    type: str
+
+    og: Optional[float] = None
+    fg: Optional[float] = None
+    abv: Optional[float] = None
+    ibu: Optional[float] = None
+    ebc: Optional[float] = None
+    bu_gu: Optional[float] = Field(default=None, serialization_alias="buGu")
+
+    fermentable_count: int = Field(default=0, serialization_alias="fermentableCount")
+    hop_count: int = Field(default=0, serialization_alias="hopCount")
+    misc_count: int = Field(default=0, serialization_alias="miscCount")
+    yeast_count: int = Field(default=0, serialization_alias="yeastCount")
+
+    model_config = {"from_attributes": True}
+
+
+# ---------- calculation ----------
+class RecipeCalcEquipmentIn(BaseModel):
+    efficiency: Optional[float] = None
+    batchVolume: Optional[float] = Field(
+        default=None, validation_alias=AliasChoices("batchVolume", "batch_volume")
+    )
+    boilTime: Optional[float] = Field(
+        default=None, validation_alias=AliasChoices("boilTime", "boil_time")
+    )
+    boilOff: Optional[float] = Field(
+        default=None, validation_alias=AliasChoices("boilOff", "boil_off")
+    )
+    deadSpace: Optional[float] = Field(
+        default=None, validation_alias=AliasChoices("deadSpace", "dead_space")
+    )
+    trubLoss: Optional[float] = Field(
+        default=None, validation_alias=AliasChoices("trubLoss", "trub_loss")
+    )
+
+    model_config = {"extra": "ignore"}
+
+    @model_validator(mode="before")
+    @classmethod
+    def _clean(cls, data):
+        return _blank_to_none(data)
+
+
+class RecipeCalcFermentableIn(BaseModel):
+    quantity: Optional[float] = None
+    potentialExtract: Optional[float] = Field(
+        default=None, validation_alias=AliasChoices("potentialExtract", "potential_extract")
+    )
+    ebc: Optional[float] = None
+
+    model_config = {"extra": "ignore"}
+
+    @model_validator(mode="before")
+    @classmethod
+    def _clean(cls, data):
+        return _blank_to_none(data)
+
+
+class RecipeCalcHopIn(BaseModel):
+    quantity: Optional[float] = None
+    alphaAcidContent: Optional[float] = Field(
+        default=None,
+        validation_alias=AliasChoices("alphaAcidContent", "alpha_acid_content"),
+    )
+    boilTime: Optional[float] = Field(
+        default=None, validation_alias=AliasChoices("boilTime", "boil_time")
+    )
+
+    model_config = {"extra": "ignore"}
+
+    @model_validator(mode="before")
+    @classmethod
+    def _clean(cls, data):
+        return _blank_to_none(data)
+
+
+class RecipeCalcYeastIn(BaseModel):
+    attenuation: Optional[float] = None
+
+    model_config = {"extra": "ignore"}
+
+    @model_validator(mode="before")
+    @classmethod
+    def _clean(cls, data):
+        return _blank_to_none(data)
+
+
+class RecipeCalculateIn(BaseModel):
+    recipeEquipment: Optional[RecipeCalcEquipmentIn] = Field(
+        default=None,
+        validation_alias=AliasChoices("recipeEquipment", "recipe_equipment"),
+    )
+    recipeFermentables: List[RecipeCalcFermentableIn] = Field(
+        default_factory=list,
+        validation_alias=AliasChoices("recipeFermentables", "recipe_fermentables"),
+    )
+    recipeHops: List[RecipeCalcHopIn] = Field(
+        default_factory=list, validation_alias=AliasChoices("recipeHops", "recipe_hops")
+    )
+    recipeYeasts: List[RecipeCalcYeastIn] = Field(
+        default_factory=list, validation_alias=AliasChoices("recipeYeasts", "recipe_yeasts")
+    )
+
+    model_config = {"extra": "ignore"}
+
+
+class RecipeStatsOut(BaseModel):
+    og: float
+    fg: float
+    abv: float
+    ibu: float
+    ebc: float
+    bu_gu: float = Field(serialization_alias="buGu")
+    pre_boil_volume: float = Field(serialization_alias="preBoilVolume")
+    hop_ibus: List[float] = Field(default_factory=list, serialization_alias="hopIbus")
+
+    model_config = {"from_attributes": True}
+
+
+class RecipeCopyIn(BaseModel):
+    # defaults to the user making the copy; only ADMIN_ID may copy to someone else
+    targetUserId: Optional[int] = Field(
+        default=None,
+        validation_alias=AliasChoices("targetUserId", "copy_target_user_id"),
+    )
+
+
+class RecipeStatsBatchIn(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=10000)
+
+
+class RecipeBatchStatsOut(BaseModel):
+    id: int
+    og: float
+    fg: float
+    abv: float
+    ibu: float
+    ebc: float
+    bu_gu: float = Field(serialization_alias="buGu")
@@ -0,0 +1,45 @@
+# app/scripts/backfill_recipe_stats.py
+import asyncio
+
+from sqlalchemy import select, update
+
+from app.database import SessionLocal
+from app.models import Recipe
+from app.services.recipe_stats import load_batch_stats
+
+BATCH_SIZE = 1000
+
+
+async def run_async():
+    session = SessionLocal()
+    try:
+        last_id = 0
+        total = 0
+        while True:
+            ids = (await session.execute(
+                select(Recipe.id)
+                .where(Recipe.og.is_(None), Recipe.id > last_id)
+                .order_by(Recipe.id)
+                .limit(BATCH_SIZE)
+            )).scalars().all()
+            if not ids:
+                break
+
+            batch = await load_batch_stats(session, ids)
+            # ORM bulk UPDATE by primary key (executemany)
+            await session.execute(update(Recipe), batch.to_records())
+            await session.commit()
+
+            last_id = ids[-1]
+            total += len(ids)
+
+        print(f"Recipe stats backfilled: {total}")
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_async())
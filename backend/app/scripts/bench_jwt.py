@@ -0,0 +1,72 @@
+# app/scripts/bench_jwt.py
+"""
+Encode/decode throughput of the JWT backends (JWT_BACKEND).
+
+    python -m app.scripts.bench_jwt --iterations 20000
+
+Also checks that every backend issues the same token and accepts the tokens
+of the others, so switching JWT_BACKEND doesn't log anybody out.
+"""
+import argparse
+import time
+
+from app.config import settings
+from app.utils.jwt import JWTBackend
+
+BACKENDS = ("jose", "pyjwt")
+
+
+def claims() -> dict:
+    now = int(time.time())
+    return {
+        "sub": "123456",
+        "typ": "access",
+        "iat": now,
+        "exp": now + 4 * 3600,
+        "iss": "brewchemy",
+    }
+
+
+def rate(fn, iterations: int) -> float:
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    secret, alg = settings.JWT_SECRET, settings.JWT_ALG
+    payload = claims()
+    backends = [JWTBackend(name) for name in BACKENDS]
+    tokens = {b.name: b.encode(payload, secret, alg) for b in backends}
+
+    if len(set(tokens.values())) != 1:
+        raise SystemExit(f"backends disagree on the token format: {tokens}")
+    for b in backends:
+        for token in tokens.values():
+            assert b.decode(token, secret, alg) == payload
+    print(f"same token from {', '.join(BACKENDS)}; all cross-decode ({alg})\n")
+
+    token = tokens[BACKENDS[0]]
+    print(f"{'backend':<8} {'encode/s':>12} {'decode/s':>12}")
+    results = {}
+    for b in backends:
+        encode = rate(lambda: b.encode(payload, secret, alg), args.iterations)
+        decode = rate(lambda: b.decode(token, secret, alg), args.iterations)
+        results[b.name] = (encode, decode)
+        print(f"{b.name:<8} {encode:>12,.0f} {decode:>12,.0f}")
+
+    base_encode, base_decode = results[BACKENDS[0]]
+    for name, (encode, decode) in results.items():
+        if name != BACKENDS[0]:
+            print(f"\n{name} vs {BACKENDS[0]}: encode {encode / base_encode:.1f}x, "
+                  f"decode {decode / base_decode:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# app/scripts/bench_recipe_list.py
+"""
+Rows/second of the recipe list: full ORM hydration + RecipeOut (before) vs the
+Core summary select (after).
+
+    python -m app.scripts.bench_recipe_list --recipes 10000 --repeat 5
+
+Creates a throwaway user with N recipes, measures, then deletes everything.
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import delete, insert, select, text
+
+from app.database import SessionLocal
+from app.models import (
+    Recipe,
+    RecipeEquipment,
+    RecipeFermentable,
+    RecipeHop,
+    RecipeMisc,
+    RecipeYeast,
+    User,
+)
+from app.schemas.recipes import RecipeOut, RecipeSummaryOut
+from app.services.recipe_summaries import recipe_summary_select, summaries_from_rows
+
+CHILD_TABLES = (RecipeEquipment, RecipeFermentable, RecipeHop, RecipeMisc, RecipeYeast)
+
+
+async def seed(session, user_id: int, n: int) -> None:
+    session.add(User(user_id=user_id, name="bench", email=f"bench-{user_id}@brewchemy.local"))
+    await session.flush()
+
+    recipe_ids = (await session.execute(
+        insert(Recipe).returning(Recipe.id),
+        [
+            {
+                "user_id": user_id,
+                "name": f"Bench recipe {i}",
+                "style": "American IPA",
+                "author": "bench",
+                "type": "All Grain",
+                "og": 1.060,
+                "fg": 1.012,
+                "abv": 6.3,
+                "ibu": 55.0,
+                "ebc": 14.0,
+                "bu_gu": 0.92,
+            }
+            for i in range(n)
+        ],
+    )).scalars().all()
+
+    common = {"user_id": user_id}
+    await session.execute(insert(RecipeEquipment), [
+        {**common, "recipe_id": rid, "name": "Kettle", "efficiency": 72, "batch_volume": 20,
+         "boil_time": 60, "boil_temperature": 100}
+        for rid in recipe_ids
+    ])
+    await session.execute(insert(RecipeFermentable), [
+        {**common, "recipe_id": rid, "name": f"Malt {k}", "ebc": 5, "potential_extract": 1.037,
+         "quantity": random.randint(200, 5000)}
+        for rid in recipe_ids for k in range(3)
+    ])
+    await session.execute(insert(RecipeHop), [
+        {**common, "recipe_id": rid, "name": f"Hop {k}", "alpha_acid_content": 10,
+         "quantity": 20, "boil_time": 60}
+        for rid in recipe_ids for k in range(2)
+    ])
+    await session.execute(insert(RecipeMisc), [
+        {**common, "recipe_id": rid, "name": "Irish moss", "quantity": 5}
+        for rid in recipe_ids
+    ])
+    await session.execute(insert(RecipeYeast), [
+        {**common, "recipe_id": rid, "name": "US-05", "attenuation": 78, "quantity": 1}
+        for rid in recipe_ids
+    ])
+    await session.commit()
+
+    # fresh planner statistics, as a long-lived database would have
+    for table in (Recipe, *CHILD_TABLES):
+        await session.execute(text(f"ANALYZE {table.__tablename__}"))
+    await session.commit()
+
+
+async def cleanup(session, user_id: int) -> None:
+    for table in CHILD_TABLES:
+        await session.execute(delete(table).where(table.user_id == user_id))
+    await session.execute(delete(Recipe).where(Recipe.user_id == user_id))
+    await session.execute(delete(User).where(User.user_id == user_id))
+    await session.commit()
+
+
+async def orm_full(session, user_id: int) -> bytes:
+    items = (await session.execute(
+        select(Recipe).where(Recipe.user_id == user_id)
+    )).scalars().all()
+    out = [RecipeOut.model_validate(i) for i in items]
+    session.expunge_all()
+    return TypeAdapter(List[RecipeOut]).dump_json(out, by_alias=True)
+
+
+async def core_summary(session, user_id: int) -> bytes:
+    rows = (await session.execute(
+        recipe_summary_select().where(Recipe.user_id == user_id)
+    )).all()
+    out = summaries_from_rows(rows)
+    return TypeAdapter(List[RecipeSummaryOut]).dump_json(out, by_alias=True)
+
+
+async def measure(label: str, fn, session, user_id: int, n: int, repeat: int) -> float:
+    await fn(session, user_id)  # warm-up (statement cache, imports)
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = await fn(session, user_id)
+        best = min(best, time.perf_counter() - start)
+        size = len(body)
+    print(f"{label:<14} {best * 1000:9.1f} ms  {n / best:11,.0f} rows/s  {size / 1024:9.0f} KiB")
+    return best
+
+
+async def run_async(n: int, repeat: int) -> None:
+    user_id = random.randint(2_000_000, 3_000_000)
+    session = SessionLocal()
+    try:
+        print(f"seeding {n} recipes for user {user_id}...")
+        await seed(session, user_id, n)
+
+        before = await measure("orm full", orm_full, session, user_id, n, repeat)
+        after = await measure("core summary", core_summary, session, user_id, n, repeat)
+        print(f"speed-up: {before / after:.1f}x")
+    finally:
+        await session.rollback()
+        await cleanup(session, user_id)
+        await session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--recipes", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run_async(args.recipes, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# app/scripts/bench_recipe_render.py
+"""
+Response rendering cost of the recipe list (GET /api/recipes) by size.
+
+    python -m app.scripts.bench_recipe_render --sizes 1000 10000
+
+The same list of RecipeOut (built in memory, each recipe with equipment, 4
+fermentables, 4 hops, 2 misc and 1 yeast) is returned through three
+otherwise identical endpoints of a throwaway app, called in-process:
+
+    json       response_model + JSONResponse (FastAPI's default rendering)
+    orjson     response_model + ORJSONResponse (the app's default class)
+    dump_json  utils.responses.json_response (what the recipe endpoints use)
+
+The database isn't involved: only what changes between the three is timed.
+The bodies are checked to decode to the same JSON first.
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import date
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.testclient import TestClient
+
+from app.schemas.recipes import RecipeOut
+from app.utils.responses import json_response
+
+VARIANTS = ("json", "orjson", "dump_json")
+
+
+def make_recipes(n: int) -> List[RecipeOut]:
+    def child(i: int, recipe_id: int, **fields) -> dict:
+        return {"id": i, "user_id": 1, "recipe_id": recipe_id, **fields}
+
+    recipes = []
+    for r in range(1, n + 1):
+        recipes.append(RecipeOut.model_validate({
+            "id": r,
+            "user_id": 1,
+            "name": f"Recipe {r}",
+            "style": "American IPA",
+            "description": "Benchmark recipe",
+            "creation_date": date(2024, 1, 1),
+            "notes": None,
+            "author": "bench",
+            "type": "All Grain",
+            "og": 1.062, "fg": 1.012, "abv": 6.56, "ibu": 55.3, "ebc": 14.2, "bu_gu": 0.89,
+            "recipe_equipment": child(
+                r, r, name="Kettle", efficiency=72, batch_volume=20, boil_time=60,
+                boil_temperature=100, boil_off=3, dead_space=1, trub_loss=1,
+            ),
+            "recipe_fermentables": [
+                child(4 * r + i, r, name=f"Malt {i}", ebc=5 + i, potential_extract=1.037,
+                      type="Base", quantity=1000 + i)
+                for i in range(4)
+            ],
+            "recipe_hops": [
+                child(4 * r + i, r, name=f"Hop {i}", alpha_acid_content=10.5, quantity=25,
+                      boil_time=60 - 15 * i, usage_stage="Boil")
+                for i in range(4)
+            ],
+            "recipe_misc": [
+                child(2 * r + i, r, name=f"Misc {i}", type="Fining", quantity=5, use="Boil",
+                      time=15)
+                for i in range(2)
+            ],
+            "recipe_yeasts": [
+                child(r, r, name="US-05", type="Ale", form="Dry", attenuation=78, quantity=11.5)
+            ],
+        }))
+    return recipes
+
+
+def make_app(recipes: List[RecipeOut]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/json", response_model=List[RecipeOut], response_class=JSONResponse)
+    async def default():
+        return recipes
+
+    @app.get("/orjson", response_model=List[RecipeOut], response_class=ORJSONResponse)
+    async def orjson():
+        return recipes
+
+    @app.get("/dump_json", response_model=List[RecipeOut])
+    async def dump_json():
+        return json_response(List[RecipeOut], recipes)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'recipes':>8} {'variant':<10} {'median ms':>10} {'min ms':>8} {'MB':>6} "
+          f"{'speedup':>8}")
+    for size in args.sizes:
+        client = TestClient(make_app(make_recipes(size)))
+
+        bodies = {v: client.get(f"/{v}").content for v in VARIANTS}  # also warms up
+        expected = json.loads(bodies["json"])
+        for v in VARIANTS[1:]:
+            if json.loads(bodies[v]) != expected:
+                raise SystemExit(f"{v} renders a different body than json at {size} recipes")
+
+        baseline = None
+        for v in VARIANTS:
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                client.get(f"/{v}")
+                times.append((time.perf_counter() - start) * 1000)
+            median = statistics.median(times)
+            baseline = baseline or median
+            print(f"{size:>8} {v:<10} {median:>10.1f} {min(times):>8.1f} "
+                  f"{len(bodies[v]) / 1e6:>6.1f} {baseline / median:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
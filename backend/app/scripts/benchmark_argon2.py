@@ -0,0 +1,99 @@
+# app/scripts/benchmark_argon2.py
+"""
+Measures Argon2id costs on this host, to choose ARGON2_MEMORY_COST /
+ARGON2_TIME_COST / ARGON2_PARALLELISM.
+
+    python -m app.scripts.benchmark_argon2 --concurrency 8 --target-ms 250
+
+--concurrency is how many hashes can run at the same time on the host:
+gunicorn workers × PASSWORD_HASH_WORKERS. Each combination is hashed by that
+many threads at once, so the latencies include the CPU and memory bandwidth
+contention of a login burst. Hashes made with other costs than the configured
+ones are rehashed on the next login of each user, so lowering the costs
+rehashes everyone too.
+"""
+import argparse
+import itertools
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from argon2 import PasswordHasher
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[idx]
+
+
+def measure(memory_cost: int, time_cost: int, parallelism: int, concurrency: int, samples: int):
+    ph = PasswordHasher(
+        time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+    )
+
+    def one(_):
+        start = time.perf_counter()
+        ph.hash("benchmark-password")
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(concurrency)))  # warm-up
+        start = time.perf_counter()
+        latencies = list(pool.map(one, range(samples)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "p50": statistics.median(latencies),
+        "p99": percentile(latencies, 99),
+        "per_second": samples / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--memory", type=int, nargs="+", default=[19456, 32768, 65536],
+                        help="memory costs to try, in KiB")
+    parser.add_argument("--time", type=int, nargs="+", default=[2, 3],
+                        help="time costs (iterations) to try")
+    parser.add_argument("--parallelism", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--concurrency", type=int, default=os.cpu_count() or 1,
+                        help="hashes running at once (workers x PASSWORD_HASH_WORKERS)")
+    parser.add_argument("--samples", type=int, default=0,
+                        help="hashes per combination (default: 10 x concurrency)")
+    parser.add_argument("--target-ms", type=float, default=250.0,
+                        help="p99 latency a login may spend hashing")
+    args = parser.parse_args()
+    samples = args.samples or 10 * args.concurrency
+
+    print(f"{args.concurrency} concurrent hashes, {samples} samples each, "
+          f"target p99 {args.target_ms:.0f} ms")
+    print(f"{'memory KiB':>10} {'t':>3} {'p':>3} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'hash/s':>8} {'peak MiB':>9}")
+
+    best = None
+    for memory_cost, time_cost, parallelism in itertools.product(
+        args.memory, args.time, args.parallelism
+    ):
+        r = measure(memory_cost, time_cost, parallelism, args.concurrency, samples)
+        ok = r["p99"] <= args.target_ms
+        peak = memory_cost * args.concurrency / 1024
+        print(f"{memory_cost:>10} {time_cost:>3} {parallelism:>3} {r['p50']:>8.1f} "
+              f"{r['p99']:>8.1f} {r['per_second']:>8.1f} {peak:>9.0f} {'ok' if ok else ''}")
+        # the strongest combination (most memory × passes) inside the target
+        if ok and (best is None or memory_cost * time_cost > best[0] * best[1]):
+            best = (memory_cost, time_cost, parallelism)
+
+    if best is None:
+        print("\nNo combination meets the target; lower the costs or the concurrency.")
+        return
+
+    print("\nStrongest combination within the target:")
+    print(f"ARGON2_MEMORY_COST={best[0]}")
+    print(f"ARGON2_TIME_COST={best[1]}")
+    print(f"ARGON2_PARALLELISM={best[2]}")
+
+
+if __name__ == "__main__":
+    main()
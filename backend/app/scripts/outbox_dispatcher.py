@@ -0,0 +1,42 @@
+# app/scripts/outbox_dispatcher.py
+"""
+Runs the outbox dispatcher as its own process, so side effects scale apart
+from the web workers:
+
+    python -m app.scripts.outbox_dispatcher
+
+Start as many as needed (SKIP LOCKED keeps them from taking the same rows);
+set OUTBOX_DISPATCH_IN_APP=false on the web workers when they do the job.
+Stops cleanly on SIGINT / SIGTERM.
+"""
+import asyncio
+import logging
+import signal
+
+from app.database import engine
+from app.services.outbox import make_dispatcher
+
+
+async def run_async():
+    dispatcher = make_dispatcher()
+    dispatcher.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    print("Outbox dispatcher running")
+    await stop.wait()
+    await dispatcher.stop()
+    await engine.dispose()
+    print(f"Outbox dispatcher stopped: {dispatcher.stats()}")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_async())
+
+
+if __name__ == "__main__":
+    main()
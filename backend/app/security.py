@@ -1,13 +1,19 @@
 # app/security.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
 from passlib.context import CryptContext
 
+from .config import settings
+
 pwd_ctx = CryptContext(
     schemes=["argon2"],
     deprecated="auto",
     # memory_cost em KiB → 65536 = 64 MiB
-    argon2__memory_cost=65536,
-    argon2__time_cost=2,
-    argon2__parallelism=2,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
 )
 
 
@@ -17,3 +23,79 @@ def hash_password(plain: str) -> str:
 
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_ctx.verify(plain, hashed)
+
+
+def needs_rehash(hashed: str) -> bool:
+    """True when the hash was made with other Argon2 costs than the current ones."""
+    return pwd_ctx.needs_update(hashed)
+
+
+class PasswordHashPool:
+    """
+    Runs Argon2 off the event loop, in a fixed number of threads.
+
+    A hash takes tens of milliseconds of CPU and ARGON2_MEMORY_COST (64 MiB) of
+    memory; called from an async handler it would stall every other request of
+    the worker. Here at most ``workers`` hashes run at once (argon2-cffi releases
+    the GIL, so they really run in parallel), which also caps the memory at
+    workers × ARGON2_MEMORY_COST.
+    Extra calls wait in line and are counted, see ``stats()``.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.waiting = 0
+        self.running = 0
+        self.peak_waiting = 0
+        self.completed = 0
+
+    async def run(self, fn, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="argon2"
+            )
+            self._slots = asyncio.Semaphore(self.workers)
+
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "waiting": self.waiting,
+            "peakWaiting": self.peak_waiting,
+            "completed": self.completed,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._slots = None
+
+
+hash_pool = PasswordHashPool(settings.PASSWORD_HASH_WORKERS)
+
+
+async def hash_password_async(plain: str) -> str:
+    return await hash_pool.run(hash_password, plain)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await hash_pool.run(verify_password, plain, hashed)
@@ -0,0 +1,330 @@
+# app/services/catalog.py
+"""
+Shared logic of the ingredient catalogs (equipments, fermentables, hops, misc,
+yeasts).
+
+Every catalog works the same way: the admin user (ADMIN_ID) owns the official
+records, users own their own rows, and editing an official record creates a
+user copy pointing back to it through ``official_id`` (shadow copy). The
+routers only declare a ``CatalogService`` with what differs between catalogs
+and delegate to it.
+
+Official records change rarely, so each service can keep them in a per-worker
+cache (see official_cache) that answers get / get_many for official ids without
+a query. list and search always run in SQL, where the pg_trgm indexes and the
+LIMIT keep them cheap whatever the size of the user's catalog.
+"""
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Type,
+    TypeVar,
+)
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import Select, and_, exists, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from ..config import settings
+from ..utils.cache import TTLCache
+from ..utils.etag import fingerprint
+from ..utils.search import text_match, text_rank
+from ..utils.sql import in_ids
+
+ADMIN_ID = 1
+PAGE_SIZE = 12
+
+# cache key of the whole official catalog and its version (the other keys are record ids)
+_OFFICIAL = "official"
+# stored instead of the catalog when it has more than CATALOG_CACHE_MAX_ITEMS rows
+_TOO_BIG = object()
+
+ModelT = TypeVar("ModelT")
+OutT = TypeVar("OutT", bound=BaseModel)
+
+
+def visible_items(model, user_id: int) -> Select:
+    """
+    Catalog rows visible to ``user_id``: their own rows plus the official
+    (ADMIN_ID) rows they have not shadowed with a copy (official_id).
+
+    One statement; the shadow check is a NOT EXISTS anti-join served by the
+    (user_id, official_id) index, so it doesn't grow with the number of overrides.
+    """
+    shadow = aliased(model)
+    shadowed = exists().where(shadow.user_id == user_id, shadow.official_id == model.id)
+    return select(model).where(
+        or_(
+            model.user_id == user_id,
+            and_(model.user_id == ADMIN_ID, ~shadowed),
+        )
+    )
+
+
+class CatalogCache(Protocol):
+    """
+    Cache of official records, keyed by id. Values are the already validated
+    output schemas, never ORM instances, so they can be shared between requests.
+    """
+
+    def get(self, key: Any) -> Any: ...
+
+    def set(self, key: Any, value: Any) -> None: ...
+
+    def invalidate(self, key: Any = None) -> None: ...
+
+
+def official_cache() -> Optional[TTLCache]:
+    """One cache per catalog, configured from the settings (None when disabled)."""
+    if settings.CATALOG_CACHE_TTL_SECONDS <= 0:
+        return None
+    return TTLCache(
+        maxsize=settings.CATALOG_CACHE_MAX_ITEMS,
+        ttl=settings.CATALOG_CACHE_TTL_SECONDS,
+    )
+
+
+class CatalogService(Generic[ModelT, OutT]):
+    def __init__(
+        self,
+        model: Type[ModelT],
+        out_schema: Type[OutT],
+        *,
+        label: str,
+        copy_fields: Sequence[str],
+        blank_to_none: Sequence[str] = (),
+        cache: Optional[CatalogCache] = None,
+    ):
+        """
+        label:         used in the error / success messages ("Hop not found")
+        copy_fields:   columns copied from an official record into a user's shadow copy
+        blank_to_none: fields where the frontend may send "" meaning "no value"
+        cache:         optional cache of official records (see CatalogCache)
+        """
+        self.model = model
+        self.out_schema = out_schema
+        self.label = label
+        self.copy_fields = tuple(copy_fields)
+        self.blank_to_none = tuple(blank_to_none)
+        self.cache = cache
+
+    # ---------- helpers ----------
+    def to_out(self, item: ModelT) -> OutT:
+        return self.out_schema.model_validate(item)
+
+    def not_found(self) -> HTTPException:
+        return HTTPException(status_code=404, detail=f"{self.label} not found")
+
+    def _remember(self, out: OutT) -> OutT:
+        if self.cache is not None and out.user_id == ADMIN_ID:
+            self.cache.set(out.id, out)
+        return out
+
+    def _forget(self, item: ModelT) -> None:
+        if self.cache is not None and item.user_id == ADMIN_ID:
+            self.cache.invalidate(item.id)
+            self.cache.invalidate(_OFFICIAL)
+
+    async def _official_entry(self, db: AsyncSession) -> tuple:
+        """
+        (official records by id or _TOO_BIG, their version), from the cache
+        (loaded on first use). Both come from the same read, so the version
+        always describes the records served.
+        """
+        entry = self.cache.get(_OFFICIAL)
+        if entry is None:
+            limit = settings.CATALOG_CACHE_MAX_ITEMS
+            items = (await db.execute(
+                select(self.model)
+                .where(self.model.user_id == ADMIN_ID)
+                .order_by(self.model.id)
+                .limit(limit + 1)
+            )).scalars().all()
+            if len(items) <= limit:
+                version = (len(items), max((i.updated_at for i in items), default=None))
+                entry = ({i.id: self.to_out(i) for i in items}, version)
+            else:
+                entry = (_TOO_BIG, None)
+            self.cache.set(_OFFICIAL, entry)
+        return entry
+
+    async def _official(self, db: AsyncSession) -> Optional[Dict[int, OutT]]:
+        """
+        All official records by id, from the cache.
+        None when there is no cache or the catalog is too big to be cached.
+        """
+        if self.cache is None:
+            return None
+
+        official, _ = await self._official_entry(db)
+        return None if official is _TOO_BIG else official
+
+    async def _cached(self, db: AsyncSession, ids: Iterable[int]) -> Dict[int, OutT]:
+        """Official records among ``ids`` that can be answered from the cache."""
+        if self.cache is None:
+            return {}
+
+        official = await self._official(db)
+        found = {}
+        for id in ids:
+            cached = official.get(id) if official is not None else self.cache.get(id)
+            if cached is not None:
+                found[id] = cached
+        return found
+
+    async def _by_id(self, db: AsyncSession, id: int) -> ModelT:
+        item = (await db.execute(
+            select(self.model).where(self.model.id == id)
+        )).scalar_one_or_none()
+        if not item:
+            raise self.not_found()
+        return item
+
+    # ---------- reads ----------
+    async def version(self, db: AsyncSession, user_id: int) -> tuple:
+        """
+        Version of everything the user can read from this catalog: the count
+        and newest updated_at of their rows and of the official ones. Any
+        create, update, shadow copy or delete changes it. One small aggregate
+        query; the official part comes with the cached catalog. Only list and
+        search are tagged with it: get / get_many mostly come from the cache,
+        where checking the version would cost more than the read itself.
+        """
+        own = (await db.execute(
+            fingerprint(self.model).where(self.model.user_id == user_id)
+        )).one()
+
+        official = None
+        if self.cache is not None:
+            _, official = await self._official_entry(db)
+        if official is None:
+            official = (await db.execute(
+                fingerprint(self.model).where(self.model.user_id == ADMIN_ID)
+            )).one()
+
+        return (user_id, *own, *official)
+
+    async def list(self, db: AsyncSession, user_id: int) -> List[OutT]:
+        items = (await db.execute(
+            visible_items(self.model, user_id).order_by(self.model.id).limit(PAGE_SIZE)
+        )).scalars().all()
+        return [self.to_out(i) for i in items]
+
+    async def search(self, db: AsyncSession, user_id: int, term: str) -> List[OutT]:
+        stmt = (
+            visible_items(self.model, user_id)
+            .where(text_match(self.model, term))
+            .order_by(*text_rank(self.model, term))
+            .limit(PAGE_SIZE)
+        )
+        items = (await db.execute(stmt)).scalars().all()
+        return [self.to_out(i) for i in items]
+
+    async def get(self, db: AsyncSession, id: int, user_id: int) -> OutT:
+        """
+        The user's row or the official row with this id. ``id`` is the primary
+        key, so at most one of the two can match: a single lookup is enough.
+        """
+        cached = await self._cached(db, (id,))
+        if cached:
+            return cached[id]
+
+        item = (await db.execute(
+            select(self.model).where(
+                self.model.id == id,
+                self.model.user_id.in_((user_id, ADMIN_ID)),
+            )
+        )).scalar_one_or_none()
+        if not item:
+            raise self.not_found()
+        return self._remember(self.to_out(item))
+
+    async def get_many(self, db: AsyncSession, ids: Iterable[int], user_id: int) -> List[OutT]:
+        """Same visibility as ``get``, for a list of ids. Unknown ids are skipped."""
+        ids = list(dict.fromkeys(ids))
+        found = await self._cached(db, ids)
+        missing = [id for id in ids if id not in found]
+
+        if missing:
+            items = (await db.execute(
+                select(self.model).where(
+                    in_ids(self.model.id, missing),
+                    self.model.user_id.in_((user_id, ADMIN_ID)),
+                )
+            )).scalars().all()
+            for item in items:
+                found[item.id] = self._remember(self.to_out(item))
+
+        return [found[id] for id in ids if id in found]
+
+    # ---------- writes ----------
+    async def create(self, db: AsyncSession, user_id: int, payload: BaseModel) -> OutT:
+        data = payload.model_dump(by_alias=False)
+        for key in self.blank_to_none:
+            if isinstance(data.get(key), str) and data[key] == "":
+                data[key] = None
+
+        new_item = self.model(user_id=user_id, **data)
+        db.add(new_item)
+        await db.commit()
+        await db.refresh(new_item)
+        self._forget(new_item)
+        return self.to_out(new_item)
+
+    async def update(
+        self, db: AsyncSession, id: int, user_id: int, payload: BaseModel
+    ) -> OutT:
+        """
+        The user's own record is updated in place; an official record is copied
+        to the user (shadow copy) and the changes are applied to the copy.
+        """
+        data = payload.model_dump(exclude_unset=True, by_alias=False)
+        data.pop("itemUserId", None)
+
+        item = await self._by_id(db, id)
+
+        if item.user_id == user_id:
+            for field, value in data.items():
+                setattr(item, field, value)
+            await db.commit()
+            await db.refresh(item)
+            self._forget(item)
+            return self.to_out(item)
+
+        if item.user_id == ADMIN_ID:
+            new_item = self.model(
+                user_id=user_id,
+                official_id=item.id,
+                **{field: getattr(item, field) for field in self.copy_fields},
+            )
+            for field, value in data.items():
+                setattr(new_item, field, value)
+
+            db.add(new_item)
+            await db.commit()
+            await db.refresh(new_item)
+            return self.to_out(new_item)
+
+        raise self.not_found()
+
+    async def delete(self, db: AsyncSession, id: int, user_id: int) -> dict:
+        item = await self._by_id(db, id)
+
+        if item.user_id == ADMIN_ID and user_id != ADMIN_ID:
+            raise HTTPException(status_code=404, detail="Cannot delete official record")
+
+        if item.user_id != user_id:
+            raise self.not_found()
+
+        self._forget(item)
+        await db.delete(item)
+        await db.commit()
+        return {"message": f"{self.label} with ID {id} was successfully deleted"}
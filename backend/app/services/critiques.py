@@ -0,0 +1,196 @@
+# app/services/critiques.py
+"""
+Cache of the AI recipe critiques (/api/openAI).
+
+Users reopen the same recipe and get it critiqued again: the same text sent
+to the same model with the same system prompt. Critiques are stored under
+the SHA-256 of exactly that (message normalized first, see ``normalize``),
+so a repeat is answered from the cache in milliseconds and the upstream API
+is billed once.
+
+Two levels:
+    - a per-worker LRU (utils.cache.TTLCache, CRITIQUE_CACHE_SIZE entries);
+    - the ``critique_cache`` table, shared by every worker and surviving
+      restarts. Rows older than CRITIQUE_CACHE_TTL_SECONDS are ignored and
+      deleted now and then.
+
+Concurrent misses of the same key in one worker share a single upstream
+call. The cache is an optimization only: when the database can't be read or
+written the critique is still returned.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from ..config import settings
+from ..database import session_scope
+from ..models import CritiqueCacheEntry
+from ..utils.cache import TTLCache
+
+logger = logging.getLogger("brewchemy")
+
+SYSTEM_PROMPT = "You will objectively critique the recipe in three lines."
+
+# expired rows are deleted at most this often (seconds, per worker)
+PURGE_INTERVAL = 3600
+
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def normalize(message: str) -> str:
+    """
+    The text as far as the critique goes: line endings, trailing spaces, runs
+    of blank lines and surrounding whitespace don't change the key.
+    """
+    lines = message.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    text = "\n".join(line.rstrip() for line in lines)
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+def critique_key(message: str, model: str, system_prompt: str = SYSTEM_PROMPT) -> str:
+    """Content address of a critique: hex SHA-256 of model, prompt and normalized message."""
+    payload = json.dumps([model, system_prompt, normalize(message)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class CritiqueCache:
+    def __init__(self, *, ttl: int, maxsize: int):
+        """
+        ttl:     seconds a critique is reused; 0 disables the cache
+        maxsize: entries of the per-worker LRU in front of the table (0 = none)
+        """
+        self.ttl = ttl
+        self._front = TTLCache(maxsize=maxsize, ttl=ttl) if ttl > 0 and maxsize > 0 else None
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._purged_at = time.monotonic() - PURGE_INTERVAL  # the first store purges
+        self.front_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_or_create(
+        self,
+        message: str,
+        model: str,
+        create: Callable[[], Awaitable[str]],
+    ) -> Tuple[str, bool]:
+        """
+        The cached critique of ``message`` by ``model``, or the one ``create()``
+        returns (then stored). Returns (critique, cache hit?). Errors raised by
+        ``create`` are not cached.
+        """
+        if self.ttl <= 0:
+            return await create(), False
+
+        key = critique_key(message, model)
+        cached = await self._lookup(key)
+        if cached is not None:
+            return cached, True
+
+        task = self._inflight.get(key)
+        if task is not None:
+            # same critique already being asked for: wait for it instead (still a miss
+            # for the client, it waits for the upstream call like the first one)
+            self.coalesced += 1
+            return await asyncio.shield(task), False
+
+        self.misses += 1
+        task = asyncio.create_task(self._create(key, model, create))
+        self._inflight[key] = task
+        task.add_done_callback(partial(self._forget, key))
+        # shielded: a client that goes away doesn't throw away a paid answer
+        return await asyncio.shield(task), False
+
+    async def get(self, message: str, model: str) -> Optional[str]:
+        """The cached critique, if any (for callers that produce it themselves, e.g. streaming)."""
+        if self.ttl <= 0:
+            return None
+        cached = await self._lookup(critique_key(message, model))
+        if cached is None:
+            self.misses += 1
+        return cached
+
+    async def put(self, message: str, model: str, critique: str) -> None:
+        if self.ttl > 0:
+            await self._store(critique_key(message, model), model, critique)
+
+    async def _create(self, key: str, model: str, create: Callable[[], Awaitable[str]]) -> str:
+        response = await create()
+        await self._store(key, model, response)
+        return response
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every waiter went away
+
+    async def _lookup(self, key: str) -> Optional[str]:
+        if self._front is not None:
+            cached = self._front.get(key)
+            if cached is not None:
+                self.front_hits += 1
+                return cached
+
+        try:
+            async with session_scope() as db:
+                row = (await db.execute(
+                    select(CritiqueCacheEntry.response, CritiqueCacheEntry.created_at).where(
+                        CritiqueCacheEntry.key == key,
+                        CritiqueCacheEntry.created_at
+                        > func.now() - timedelta(seconds=self.ttl),
+                    )
+                )).first()
+        except Exception:
+            logger.exception("[critique] Cache lookup failed")
+            return None
+        if row is None:
+            return None
+
+        self.db_hits += 1
+        if self._front is not None:
+            left = self.ttl - (datetime.now(timezone.utc) - row.created_at).total_seconds()
+            self._front.set(key, row.response, ttl=max(left, 0))
+        return row.response
+
+    async def _store(self, key: str, model: str, response: str) -> None:
+        if self._front is not None:
+            self._front.set(key, response)
+        try:
+            async with session_scope() as db:
+                stmt = insert(CritiqueCacheEntry).values(key=key, model=model, response=response)
+                await db.execute(stmt.on_conflict_do_update(
+                    index_elements=[CritiqueCacheEntry.key],
+                    set_={"response": stmt.excluded.response, "created_at": func.now()},
+                ))
+                if time.monotonic() - self._purged_at > PURGE_INTERVAL:
+                    self._purged_at = time.monotonic()
+                    await db.execute(delete(CritiqueCacheEntry).where(
+                        CritiqueCacheEntry.created_at < func.now() - timedelta(seconds=self.ttl)
+                    ))
+        except Exception:
+            logger.exception("[critique] Cache store failed")
+
+    def stats(self) -> dict:
+        return {
+            "frontItems": len(self._front) if self._front is not None else 0,
+            "frontHits": self.front_hits,
+            "dbHits": self.db_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
+
+
+critique_cache = CritiqueCache(
+    ttl=settings.CRITIQUE_CACHE_TTL_SECONDS,
+    maxsize=settings.CRITIQUE_CACHE_SIZE,
+)
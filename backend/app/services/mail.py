@@ -0,0 +1,116 @@
+# app/services/mail.py
+"""
+Outgoing e-mail transports.
+
+Mails aren't sent from the request: they are written to the outbox and sent
+by the dispatcher (services/outbox.py), which keeps one transport between
+batches. With SMTP that is one connection (connect, STARTTLS and login once,
+not per message), reconnected when the server drops it and closed after
+MAIL_IDLE_SECONDS without mail.
+
+The transport is pluggable (MAIL_TRANSPORT): "smtp", or "console" to only
+log the messages. Point the SMTP one at a local debugging server
+(e.g. ``python -m aiosmtpd -n -l localhost:1025``) to see the mails in dev.
+"""
+import logging
+from email.message import EmailMessage
+from typing import List, Optional, Protocol, Sequence
+
+import aiosmtplib
+
+from ..config import settings
+
+logger = logging.getLogger("brewchemy")
+
+
+class MailTransport(Protocol):
+    async def send_batch(self, messages: Sequence[EmailMessage]) -> List[Optional[Exception]]:
+        """Sends the messages in order; one entry per message, None when it was sent."""
+        ...
+
+    async def close(self) -> None: ...
+
+
+class SMTPTransport:
+    """One persistent (re)connecting SMTP connection."""
+
+    def __init__(self):
+        port = int(settings.MAIL_PORT)
+        self._smtp = aiosmtplib.SMTP(
+            hostname=settings.MAIL_SERVER,
+            port=port,
+            use_tls=port == 465,
+            start_tls=port != 465 and settings.MAIL_USE_TLS,
+            username=settings.MAIL_USERNAME or None,
+            password=settings.MAIL_PASSWORD or None,
+            timeout=settings.MAIL_TIMEOUT_SECONDS,
+        )
+
+    async def _send(self, message: EmailMessage) -> None:
+        if not self._smtp.is_connected:
+            await self._smtp.connect()
+        try:
+            await self._smtp.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            # idle connection closed by the server: once more on a new one
+            self._smtp.close()
+            await self._smtp.connect()
+            await self._smtp.send_message(message)
+
+    async def send_batch(self, messages: Sequence[EmailMessage]) -> List[Optional[Exception]]:
+        """
+        A refused message (SMTP answer) doesn't stop the batch. A connection
+        error does: it is returned for the remaining messages too, instead of
+        waiting out MAIL_TIMEOUT_SECONDS again for each of them.
+        """
+        results: List[Optional[Exception]] = []
+        for message in messages:
+            try:
+                await self._send(message)
+                results.append(None)
+            except (aiosmtplib.SMTPResponseException, aiosmtplib.SMTPRecipientsRefused) as e:
+                results.append(e)
+            except Exception as e:
+                # connection in an unknown state: the next batch starts over
+                self._smtp.close()
+                results.extend([e] * (len(messages) - len(results)))
+                break
+        return results
+
+    async def close(self) -> None:
+        if self._smtp.is_connected:
+            try:
+                await self._smtp.quit()
+            except aiosmtplib.SMTPException:
+                self._smtp.close()
+
+
+class ConsoleTransport:
+    """Logs the messages instead of sending them."""
+
+    async def send_batch(self, messages: Sequence[EmailMessage]) -> List[Optional[Exception]]:
+        for message in messages:
+            logger.info(
+                "[email] To: %s | Subject: %s\n%s",
+                message["To"], message["Subject"], message.get_content(),
+            )
+        return [None] * len(messages)
+
+    async def close(self) -> None:
+        pass
+
+
+TRANSPORTS = {"smtp": SMTPTransport, "console": ConsoleTransport}
+
+
+def is_permanent(error: Exception) -> bool:
+    """5xx answers (bad address, rejected message...) won't change on retry."""
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, aiosmtplib.SMTPResponseException) and 500 <= error.code < 600
+
+
+def mail_configured() -> bool:
+    if settings.MAIL_TRANSPORT != "smtp":
+        return True
+    return bool(settings.MAIL_SERVER and settings.MAIL_PORT and settings.MAIL_DEFAULT_SENDER)
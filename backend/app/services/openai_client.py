@@ -0,0 +1,61 @@
+# app/services/openai_client.py
+"""
+The OpenAI client shared by every request of a worker process.
+
+An ``AsyncOpenAI`` owns an httpx connection pool: built once at startup (see
+the lifespan in main.py) instead of per request, consecutive critiques reuse
+the open TLS connections to the API instead of paying a new TCP and TLS
+handshake each time. The pool size and timeouts come from the OPENAI_*
+settings; OPENAI_BASE_URL points it at any OpenAI-compatible server (a proxy,
+or a local stub in dev).
+"""
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from ..config import settings
+
+
+class OpenAIClient:
+    def __init__(self):
+        self._client: Optional[AsyncOpenAI] = None
+
+    def configured(self) -> bool:
+        return bool(settings.OPENAI_API_KEY)
+
+    def open(self) -> None:
+        """Builds the client; no-op when it exists or OPENAI_API_KEY isn't set."""
+        if self._client is not None or not self.configured():
+            return
+        self._client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            max_retries=settings.OPENAI_MAX_RETRIES,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE,
+                ),
+                timeout=httpx.Timeout(
+                    settings.OPENAI_TIMEOUT_SECONDS,
+                    connect=settings.OPENAI_CONNECT_SECONDS,
+                ),
+            ),
+        )
+
+    def get(self) -> AsyncOpenAI:
+        """The shared client (opened here when the lifespan didn't run, e.g. in scripts)."""
+        self.open()
+        if self._client is None:
+            raise RuntimeError("OPENAI_API_KEY not configured")
+        return self._client
+
+    async def close(self) -> None:
+        """Closes the pooled connections (lifespan shutdown, after the requests drained)."""
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.close()
+
+
+openai_client = OpenAIClient()
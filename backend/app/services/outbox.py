@@ -0,0 +1,278 @@
+# app/services/outbox.py
+"""
+Transactional outbox.
+
+Side effects that must not be lost (confirmation and password reset mails)
+are written as ``outbox`` rows in the same transaction as the change that
+causes them: if the request fails nothing is sent, and once it commits the
+row survives worker restarts until a dispatcher has run it.
+
+``OutboxDispatcher`` claims pending rows in batches with
+``SELECT ... FOR UPDATE SKIP LOCKED`` and leases them (available_at pushed
+OUTBOX_LEASE_SECONDS ahead) before running them outside of any transaction,
+so any number of dispatchers (one per web worker with OUTBOX_DISPATCH_IN_APP,
+and/or dedicated processes, see app/scripts/outbox_dispatcher.py) share the
+table without sending a row twice while its lease lasts. A row is deleted once
+its handler succeeds; failures are retried with exponential backoff
+(available_at) and after OUTBOX_MAX_ATTEMPTS, or on a permanent error, the
+row is kept with failed_at set.
+"""
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database import session_scope
+from ..models import OutboxMessage
+from ..utils.sql import in_ids
+from .mail import TRANSPORTS, is_permanent, mail_configured
+
+logger = logging.getLogger("brewchemy")
+
+EMAIL = "email"
+
+# payloads of one kind -> one result per payload (None = done)
+Handler = Callable[[Sequence[dict]], Awaitable[List[Optional[Exception]]]]
+
+
+def add_email(db: AsyncSession, to: str, subject: str, body: str) -> bool:
+    """
+    Adds a mail to the outbox of ``db``'s transaction (sent after the commit).
+    False when mail isn't configured.
+    """
+    if not mail_configured():
+        logger.warning(
+            "[email] Config incompleta: MAIL_SERVER/MAIL_PORT/MAIL_DEFAULT_SENDER ausentes."
+        )
+        return False
+
+    db.add(OutboxMessage(kind=EMAIL, payload={"to": to, "subject": subject, "body": body}))
+    return True
+
+
+class EmailHandler:
+    """Sends EMAIL rows through one MAIL_TRANSPORT connection, kept between batches."""
+
+    def __init__(self):
+        self._transport = None
+
+    async def __call__(self, payloads: Sequence[dict]) -> List[Optional[Exception]]:
+        if self._transport is None:
+            self._transport = TRANSPORTS[settings.MAIL_TRANSPORT]()
+
+        messages = []
+        for p in payloads:
+            message = EmailMessage()
+            message["Subject"] = p["subject"]
+            message["From"] = settings.MAIL_DEFAULT_SENDER or "brewchemy@localhost"
+            message["To"] = p["to"]
+            message.set_content(p["body"])
+            messages.append(message)
+        return await self._transport.send_batch(messages)
+
+    async def close(self) -> None:
+        if self._transport is not None:
+            await self._transport.close()
+
+
+class OutboxDispatcher:
+    def __init__(
+        self,
+        handlers: Dict[str, Handler],
+        *,
+        batch_size: int,
+        lease: float,
+        poll: float,
+        max_attempts: int,
+        backoff: float,
+        idle: float,
+    ):
+        """
+        handlers:     kind -> handler; a handler may have an async close()
+        lease:        seconds a claimed row is hidden from other dispatchers
+        poll:         seconds between two looks at an empty outbox
+        max_attempts: failures after which a row is given up (failed_at)
+        backoff:      first retry delay in seconds, doubled on every attempt
+        idle:         seconds without rows after which the handlers are closed
+        """
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.lease = lease
+        self.poll = poll
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.idle = idle
+        self._task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    async def dispatch_batch(self) -> int:
+        """Claims and runs up to batch_size due rows; returns how many were claimed."""
+        rows = await self._claim()
+        if not rows:
+            return 0
+
+        by_kind: Dict[str, list] = {}
+        for row in rows:
+            by_kind.setdefault(row.kind, []).append(row)
+
+        # no transaction is open while the handlers run: the rows are only
+        # protected by their lease, so a slow SMTP server holds no lock and no
+        # pooled connection
+        done, failed = [], []
+        for kind, group in by_kind.items():
+            handler = self.handlers.get(kind)
+            if handler is None:
+                results = [LookupError(f"no outbox handler for {kind!r}")] * len(group)
+            else:
+                try:
+                    results = await handler([row.payload for row in group])
+                except Exception as e:
+                    results = [e] * len(group)
+
+            for row, error in zip(group, results):
+                if error is None:
+                    done.append(row.id)
+                else:
+                    failed.append(self._failed(row, error, permanent=handler is None))
+
+        async with session_scope() as db:
+            if done:
+                await db.execute(delete(OutboxMessage).where(in_ids(OutboxMessage.id, done)))
+            if failed:
+                await db.execute(update(OutboxMessage), failed)
+        self.sent += len(done)
+        return len(rows)
+
+    async def _claim(self) -> list:
+        """
+        Leases up to batch_size due rows: their available_at is pushed
+        OUTBOX_LEASE_SECONDS ahead in a short transaction of its own, so other
+        dispatchers skip them until they are deleted or rescheduled. If this
+        dispatcher dies first, the rows become due again when the lease ends
+        (delivery is at least once).
+        """
+        due = (
+            select(OutboxMessage.id)
+            .where(
+                OutboxMessage.failed_at.is_(None),
+                OutboxMessage.available_at <= func.now(),
+            )
+            .order_by(OutboxMessage.available_at, OutboxMessage.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        async with session_scope() as db:
+            rows = (await db.execute(
+                update(OutboxMessage)
+                .where(OutboxMessage.id.in_(due))
+                .values(available_at=func.now() + timedelta(seconds=self.lease))
+                .returning(
+                    OutboxMessage.id,
+                    OutboxMessage.kind,
+                    OutboxMessage.payload,
+                    OutboxMessage.attempts,
+                )
+            )).all()
+        return sorted(rows, key=lambda row: row.id)
+
+    def _failed(self, row, error: Exception, *, permanent: bool) -> dict:
+        """The update of a claimed row whose handler failed (retry or give up)."""
+        now = datetime.now(timezone.utc)
+        attempts = row.attempts + 1
+        last_error = f"{type(error).__name__}: {error}"[:2000]
+        values = {
+            "id": row.id,
+            "attempts": attempts,
+            "last_error": last_error,
+            "available_at": now,
+            "failed_at": None,
+        }
+
+        if permanent or is_permanent(error) or attempts >= self.max_attempts:
+            values["failed_at"] = now
+            self.failed += 1
+            logger.error(
+                "[outbox] Giving up on %s #%d after %d attempt(s): %s",
+                row.kind, row.id, attempts, last_error,
+            )
+            return values
+
+        delay = self.backoff * 2 ** (attempts - 1) * random.uniform(0.8, 1.2)
+        values["available_at"] = now + timedelta(seconds=delay)
+        self.retried += 1
+        logger.warning(
+            "[outbox] %s #%d failed (%s), retry in %.0fs", row.kind, row.id, last_error, delay
+        )
+        return values
+
+    async def run(self) -> None:
+        """Dispatches until cancelled."""
+        idle_since = None
+        try:
+            while True:
+                try:
+                    claimed = await self.dispatch_batch()
+                except Exception:
+                    logger.exception("[outbox] Dispatch failed")
+                    claimed = 0
+
+                if claimed == self.batch_size:
+                    continue  # more may be due right away
+                if claimed:
+                    idle_since = None
+                elif idle_since is None:
+                    idle_since = asyncio.get_running_loop().time()
+                elif asyncio.get_running_loop().time() - idle_since > self.idle:
+                    await self.close_handlers()
+                    idle_since = None
+                await asyncio.sleep(self.poll)
+        finally:
+            await self.close_handlers()
+
+    async def close_handlers(self) -> None:
+        for handler in self.handlers.values():
+            close = getattr(handler, "close", None)
+            if close is not None:
+                await close()
+
+    # ---------- in-app dispatcher (lifespan) ----------
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(), name="outbox-dispatcher")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+
+def make_dispatcher() -> OutboxDispatcher:
+    return OutboxDispatcher(
+        {EMAIL: EmailHandler()},
+        batch_size=settings.OUTBOX_BATCH_SIZE,
+        lease=settings.OUTBOX_LEASE_SECONDS,
+        poll=settings.OUTBOX_POLL_SECONDS,
+        max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+        backoff=settings.OUTBOX_BACKOFF_SECONDS,
+        idle=settings.MAIL_IDLE_SECONDS,
+    )
+
+
+outbox_dispatcher = make_dispatcher()
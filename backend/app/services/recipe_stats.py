@@ -0,0 +1,109 @@
+# app/services/recipe_stats.py
+from typing import Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import (
+    RecipeEquipment,
+    RecipeFermentable,
+    RecipeHop,
+    RecipeYeast,
+)
+from ..utils.calculation import (
+    RecipeStats,
+    RecipeStatsBatch,
+    RecipeVectors,
+    calculate_batch,
+)
+from ..utils.sql import in_ids
+
+STATS_FIELDS = ("og", "fg", "abv", "ibu", "ebc", "bu_gu")
+
+
+def vectors_from_payload(payload) -> RecipeVectors:
+    """Accepts RecipeCreate, RecipeCalculateIn or anything with the same shape."""
+    eq = payload.recipeEquipment
+    return RecipeVectors.from_rows(
+        equipment=(
+            (eq.batchVolume, eq.efficiency, eq.boilTime, eq.boilOff, eq.deadSpace, eq.trubLoss)
+            if eq
+            else None
+        ),
+        fermentables=[
+            (f.quantity, f.potentialExtract, f.ebc) for f in payload.recipeFermentables or []
+        ],
+        hops=[(h.quantity, h.alphaAcidContent, h.boilTime) for h in payload.recipeHops or []],
+        yeasts=[y.attenuation for y in payload.recipeYeasts or []],
+    )
+
+
+async def load_vectors(db: AsyncSession, recipe_id: int) -> RecipeVectors:
+    # only the columns the formulas need, no ORM hydration
+    equipment = (await db.execute(
+        select(
+            RecipeEquipment.batch_volume,
+            RecipeEquipment.efficiency,
+            RecipeEquipment.boil_time,
+            RecipeEquipment.boil_off,
+            RecipeEquipment.dead_space,
+            RecipeEquipment.trub_loss,
+        ).where(RecipeEquipment.recipe_id == recipe_id)
+    )).first()
+    fermentables = (await db.execute(
+        select(
+            RecipeFermentable.quantity,
+            RecipeFermentable.potential_extract,
+            RecipeFermentable.ebc,
+        ).where(RecipeFermentable.recipe_id == recipe_id)
+    )).all()
+    hops = (await db.execute(
+        select(
+            RecipeHop.quantity,
+            RecipeHop.alpha_acid_content,
+            RecipeHop.boil_time,
+        ).where(RecipeHop.recipe_id == recipe_id)
+    )).all()
+    yeasts = (await db.execute(
+        select(RecipeYeast.attenuation).where(RecipeYeast.recipe_id == recipe_id)
+    )).scalars().all()
+
+    return RecipeVectors.from_rows(equipment, fermentables, hops, yeasts)
+
+
+async def load_batch_stats(db: AsyncSession, ids: Sequence[int]) -> RecipeStatsBatch:
+    # one set-based query per table, all recipes at once
+    equipment = (await db.execute(
+        select(
+            RecipeEquipment.recipe_id,
+            RecipeEquipment.batch_volume,
+            RecipeEquipment.efficiency,
+        ).where(in_ids(RecipeEquipment.recipe_id, ids))
+    )).all()
+    fermentables = (await db.execute(
+        select(
+            RecipeFermentable.recipe_id,
+            RecipeFermentable.quantity,
+            RecipeFermentable.potential_extract,
+            RecipeFermentable.ebc,
+        ).where(in_ids(RecipeFermentable.recipe_id, ids))
+    )).all()
+    hops = (await db.execute(
+        select(
+            RecipeHop.recipe_id,
+            RecipeHop.quantity,
+            RecipeHop.alpha_acid_content,
+            RecipeHop.boil_time,
+        ).where(in_ids(RecipeHop.recipe_id, ids))
+    )).all()
+    yeasts = (await db.execute(
+        select(RecipeYeast.recipe_id, RecipeYeast.attenuation).where(
+            in_ids(RecipeYeast.recipe_id, ids)
+        )
+    )).all()
+
+    return calculate_batch(ids, equipment, fermentables, hops, yeasts)
+
+
+def stats_values(stats: RecipeStats) -> dict:
+    return {f: getattr(stats, f) for f in STATS_FIELDS}
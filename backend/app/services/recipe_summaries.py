@@ -0,0 +1,64 @@
+# app/services/recipe_summaries.py
+from typing import Iterable, List
+
+from sqlalchemy import Float, Select, cast, func, select
+
+from ..models import (
+    Recipe,
+    RecipeFermentable,
+    RecipeHop,
+    RecipeMisc,
+    RecipeYeast,
+)
+from ..schemas.recipes import RecipeSummaryOut
+
+
+def _count(child) -> object:
+    # correlated COUNT(*) served by the recipe_id index of each child table
+    return (
+        select(func.count())
+        .where(child.recipe_id == Recipe.id)
+        .correlate(Recipe)
+        .scalar_subquery()
+    )
+
+
+# (label, column expression) in the order the row tuples come back
+SUMMARY_COLUMNS = (
+    ("id", Recipe.id),
+    ("user_id", Recipe.user_id),
+    ("name", Recipe.name),
+    ("style", Recipe.style),
+    ("creation_date", Recipe.creation_date),
+    ("author", Recipe.author),
+    ("type", Recipe.type),
+    # numeric -> float8 in SQL, so rows already hold the output types
+    ("og", cast(Recipe.og, Float)),
+    ("fg", cast(Recipe.fg, Float)),
+    ("abv", cast(Recipe.abv, Float)),
+    ("ibu", cast(Recipe.ibu, Float)),
+    ("ebc", cast(Recipe.ebc, Float)),
+    ("bu_gu", cast(Recipe.bu_gu, Float)),
+    ("fermentable_count", _count(RecipeFermentable)),
+    ("hop_count", _count(RecipeHop)),
+    ("misc_count", _count(RecipeMisc)),
+    ("yeast_count", _count(RecipeYeast)),
+)
+
+SUMMARY_FIELDS = tuple(label for label, _ in SUMMARY_COLUMNS)
+
+
+def recipe_summary_select() -> Select:
+    """Core SELECT of the summary columns; callers add WHERE/ORDER BY/LIMIT."""
+    return select(*(expr.label(label) for label, expr in SUMMARY_COLUMNS))
+
+
+def summaries_from_rows(rows: Iterable[tuple]) -> List[RecipeSummaryOut]:
+    # values come straight from the driver with the right types, so the
+    # models are constructed without a validation pass
+    fields = SUMMARY_FIELDS
+    fields_set = set(fields)
+    return [
+        RecipeSummaryOut.model_construct(fields_set, **dict(zip(fields, row)))
+        for row in rows
+    ]
@@ -0,0 +1,126 @@
+# app/services/recipe_transfer.py
+"""
+Bulk export / import of a user's recipes, as newline-delimited JSON (one
+RecipeOut / RecipeCreate per line) or BeerXML 1.0 (see utils/beerxml).
+
+Both directions stream: export reads the recipes through a server-side
+cursor, EXPORT_BATCH rows at a time, each row already carrying its children
+(recipe_with_children); import parses the request body as it arrives and
+inserts every IMPORT_BATCH recipes with insert_recipes. Neither holds more than
+one batch in memory, however many recipes the account has.
+"""
+from typing import AsyncIterable, AsyncIterator, List, Literal
+from xml.etree.ElementTree import ParseError
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import session_scope
+from ..models import Recipe
+from ..schemas.recipes import RecipeCreate
+from ..utils.beerxml import DOCUMENT_END, DOCUMENT_START, RecipeParser, recipe_to_xml
+from .recipe_writes import insert_recipes, recipe_out, recipe_with_children
+
+TransferFormat = Literal["ndjson", "beerxml"]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "beerxml": "application/xml"}
+EXTENSIONS = {"ndjson": "ndjson", "beerxml": "xml"}
+
+EXPORT_BATCH = 200
+IMPORT_BATCH = 200
+
+
+async def export_recipes(user_id: int, fmt: TransferFormat) -> AsyncIterator[str]:
+    """
+    The user's recipes in ``fmt``, one chunk per batch of rows.
+
+    Runs in its own session: the response is streamed after the endpoint has
+    returned, when get_db() has already closed the request's session.
+    """
+    if fmt == "beerxml":
+        yield DOCUMENT_START
+
+    async with session_scope() as db:
+        result = await db.stream(
+            recipe_with_children()
+            .where(Recipe.user_id == user_id)
+            .order_by(Recipe.id)
+            .execution_options(yield_per=EXPORT_BATCH)
+        )
+        async for rows in result.mappings().partitions():
+            recipes = [recipe_out(row) for row in rows]
+            if fmt == "beerxml":
+                yield "".join(recipe_to_xml(r) for r in recipes)
+            else:
+                yield "".join(r.model_dump_json(by_alias=True) + "\n" for r in recipes)
+
+    if fmt == "beerxml":
+        yield DOCUMENT_END
+
+
+def _invalid(position: int, e: ValidationError) -> HTTPException:
+    return HTTPException(
+        status_code=422,
+        detail={
+            "recipe": position,
+            "errors": e.errors(include_url=False, include_context=False, include_input=False),
+        },
+    )
+
+
+async def _ndjson_payloads(body: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    pending = b""
+    async for chunk in body:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield line
+    if pending.strip():
+        yield pending
+
+
+async def _beerxml_payloads(body: AsyncIterable[bytes]) -> AsyncIterator[dict]:
+    parser = RecipeParser()
+    try:
+        async for chunk in body:
+            for recipe in parser.feed(chunk):
+                yield recipe
+        for recipe in parser.close():
+            yield recipe
+    except ParseError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid BeerXML: {e}")
+
+
+async def import_recipes(
+    db: AsyncSession, user_id: int, body: AsyncIterable[bytes], fmt: TransferFormat
+) -> List[int]:
+    """
+    Creates the recipes read from ``body`` and returns their ids. A recipe
+    that doesn't validate aborts the import (422 with its 1-based position);
+    nothing is committed here, so the caller's rollback discards the batches
+    already inserted.
+    """
+    ids: List[int] = []
+    batch: List[RecipeCreate] = []
+    position = 0
+
+    if fmt == "beerxml":
+        payloads, validate = _beerxml_payloads(body), RecipeCreate.model_validate
+    else:
+        payloads, validate = _ndjson_payloads(body), RecipeCreate.model_validate_json
+
+    async for payload in payloads:
+        position += 1
+        try:
+            batch.append(validate(payload))
+        except ValidationError as e:
+            raise _invalid(position, e)
+
+        if len(batch) == IMPORT_BATCH:
+            ids.extend(r.id for r in await insert_recipes(db, user_id, batch))
+            batch = []
+
+    ids.extend(r.id for r in await insert_recipes(db, user_id, batch))
+    return ids
@@ -0,0 +1,404 @@
+# app/services/recipe_writes.py
+"""
+Set-based writes of recipes and their child rows (equipment, fermentables,
+hops, misc, yeasts): one statement per table instead of one ORM object per
+row, and the response is built from what was written instead of being read
+back from the database.
+"""
+from dataclasses import dataclass
+from itertools import chain
+from typing import Callable, List, Optional, Sequence
+
+from sqlalchemy import JSON, Select, delete, func, insert, literal, select, text, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import (
+    Recipe,
+    RecipeEquipment,
+    RecipeFermentable,
+    RecipeHop,
+    RecipeMisc,
+    RecipeYeast,
+)
+from ..schemas.recipes import RecipeOut
+from ..utils.calculation import RecipeVectors, calculate_recipe
+from ..utils.sql import in_ids
+from .recipe_stats import stats_values, vectors_from_payload
+
+
+# ---------- payload (camelCase schemas) -> column values ----------
+def equipment_values(eq) -> dict:
+    return {
+        "name": eq.name,
+        "description": eq.description,
+        "efficiency": eq.efficiency,
+        "batch_volume": eq.batchVolume,
+        "boil_time": eq.boilTime,
+        "boil_temperature": eq.boilTemperature,
+        "batch_time": eq.batchTime,
+        "boil_off": eq.boilOff,
+        "dead_space": eq.deadSpace,
+        "trub_loss": eq.trubLoss,
+    }
+
+
+def fermentable_values(f) -> dict:
+    return {
+        "name": f.name,
+        "description": f.description,
+        "ebc": f.ebc,
+        "potential_extract": f.potentialExtract,
+        "type": f.type,
+        "supplier": f.supplier,
+        "unit_price": f.unitPrice,
+        "quantity": f.quantity,
+    }
+
+
+def hop_values(h) -> dict:
+    return {
+        "name": h.name,
+        "alpha_acid_content": h.alphaAcidContent,
+        "beta_acid_content": h.betaAcidContent,
+        "use_type": h.useType,
+        "country_of_origin": h.countryOfOrigin,
+        "description": h.description,
+        "quantity": h.quantity,
+        "boil_time": h.boilTime,
+        "usage_stage": h.usageStage,
+    }
+
+
+def misc_values(m) -> dict:
+    return {
+        "name": m.name,
+        "description": m.description,
+        "type": m.type,
+        "quantity": m.quantity,
+        "use": m.use,
+        "time": m.time,
+    }
+
+
+def yeast_values(y) -> dict:
+    return {
+        "name": y.name,
+        "manufacturer": y.manufacturer,
+        "type": y.type,
+        "form": y.form,
+        "attenuation": y.attenuation,
+        "temperature_range": y.temperatureRange,
+        "flavor_profile": y.flavorProfile,
+        "flocculation": y.flocculation,
+        "description": y.description,
+        "quantity": y.quantity,
+    }
+
+
+@dataclass(frozen=True)
+class ChildTable:
+    model: type
+    payload_field: str  # RecipeCreate / RecipeUpdate attribute
+    out_field: str  # RecipeOut attribute (= Recipe relationship)
+    values: Callable[[object], dict]
+    many: bool = True
+
+    def items(self, payload) -> list:
+        value = getattr(payload, self.payload_field)
+        if self.many:
+            return list(value or [])
+        return [value] if value else []
+
+    @property
+    def columns(self) -> List[str]:
+        return [c.key for c in self.model.__mapper__.column_attrs]
+
+    def rows_json(self):
+        """Correlated subquery: this table's rows of the recipe, as a JSON array."""
+        row = func.json_build_object(
+            *chain.from_iterable(
+                (literal(name), getattr(self.model, name)) for name in self.columns
+            )
+        )
+        return (
+            select(
+                func.coalesce(
+                    func.json_agg(aggregate_order_by(row, self.model.id)),
+                    text("'[]'::json"),
+                    type_=JSON,
+                )
+            )
+            .where(self.model.recipe_id == Recipe.id)
+            .scalar_subquery()
+            .label(self.out_field)
+        )
+
+
+CHILD_TABLES = (
+    ChildTable(
+        RecipeEquipment, "recipeEquipment", "recipe_equipment", equipment_values, many=False
+    ),
+    ChildTable(
+        RecipeFermentable, "recipeFermentables", "recipe_fermentables", fermentable_values
+    ),
+    ChildTable(RecipeHop, "recipeHops", "recipe_hops", hop_values),
+    ChildTable(RecipeMisc, "recipeMisc", "recipe_misc", misc_values),
+    ChildTable(RecipeYeast, "recipeYeasts", "recipe_yeasts", yeast_values),
+)
+
+
+def recipe_with_children() -> Select:
+    """
+    Recipe columns plus one JSON array per child table, labeled like the
+    RecipeOut fields: a whole recipe per row, without any extra query.
+    """
+    return select(
+        *(getattr(Recipe, c.key) for c in Recipe.__mapper__.column_attrs),
+        *(table.rows_json() for table in CHILD_TABLES),
+    )
+
+
+def recipe_out(row) -> RecipeOut:
+    """RecipeOut of a recipe_with_children() row."""
+    recipe = dict(row)
+    for table in CHILD_TABLES:
+        if not table.many:
+            rows = recipe[table.out_field]
+            recipe[table.out_field] = rows[0] if rows else None
+    return RecipeOut.model_validate(recipe)
+
+
+RECIPE_FIELDS = ("name", "style", "description", "notes", "author", "type")
+# child tables the cached stats depend on
+STATS_TABLES = {RecipeEquipment, RecipeFermentable, RecipeHop, RecipeYeast}
+
+
+async def _insert_rows(db: AsyncSession, model, rows: List[dict]) -> List[int]:
+    """Multi-row INSERT; the new ids come back in the order of ``rows``."""
+    return (await db.execute(
+        insert(model).returning(model.id, sort_by_parameter_order=True),
+        rows,
+    )).scalars().all()
+
+
+def recipe_values(user_id: int, payload) -> dict:
+    return {
+        "user_id": user_id,
+        "name": payload.name,
+        "style": payload.style,
+        "description": payload.description,
+        "notes": payload.notes,
+        "author": payload.author or "",
+        "type": payload.type,
+        **stats_values(calculate_recipe(vectors_from_payload(payload))),
+    }
+
+
+async def insert_recipes(db: AsyncSession, user_id: int, payloads: Sequence) -> List[RecipeOut]:
+    """
+    Creates the recipes of ``payloads`` (RecipeCreate) with their children:
+    one INSERT ... RETURNING for the recipes and one multi-row insert per
+    child table, whatever the number of recipes. Doesn't commit.
+    """
+    if not payloads:
+        return []
+
+    recipes = [recipe_values(user_id, p) for p in payloads]
+    created = (await db.execute(
+        insert(Recipe).returning(
+            Recipe.id, Recipe.creation_date, sort_by_parameter_order=True
+        ),
+        recipes,
+    )).all()
+    for recipe, (id, creation_date) in zip(recipes, created):
+        recipe.update(id=id, creation_date=creation_date)
+
+    for table in CHILD_TABLES:
+        rows = []
+        owners = []
+        for recipe, payload in zip(recipes, payloads):
+            recipe[table.out_field] = [] if table.many else None
+            for item in table.items(payload):
+                rows.append({"user_id": user_id, "recipe_id": recipe["id"], **table.values(item)})
+                owners.append(recipe)
+        if not rows:
+            continue
+
+        ids = await _insert_rows(db, table.model, rows)
+        for row, id, recipe in zip(rows, ids, owners):
+            row["id"] = id
+            if table.many:
+                recipe[table.out_field].append(row)
+            else:
+                recipe[table.out_field] = row
+
+    return [RecipeOut.model_validate(r) for r in recipes]
+
+
+EQUIPMENT_VECTOR = (
+    "batch_volume", "efficiency", "boil_time", "boil_off", "dead_space", "trub_loss"
+)
+
+
+def _vectors(recipe: dict) -> RecipeVectors:
+    """RecipeVectors of a recipe held as dicts (column name -> value)."""
+    eq = recipe["recipe_equipment"]
+    return RecipeVectors.from_rows(
+        equipment=tuple(eq[k] for k in EQUIPMENT_VECTOR) if eq else None,
+        fermentables=[
+            (f["quantity"], f["potential_extract"], f["ebc"])
+            for f in recipe["recipe_fermentables"]
+        ],
+        hops=[
+            (h["quantity"], h["alpha_acid_content"], h["boil_time"])
+            for h in recipe["recipe_hops"]
+        ],
+        yeasts=[y["attenuation"] for y in recipe["recipe_yeasts"]],
+    )
+
+
+COPY_SUFFIX = " (Cópia)"
+# columns set by the copy itself (the rest is copied as is)
+_OWNER_COLUMNS = {"id", "user_id", "recipe_id", "creation_date", "updated_at"}
+
+
+def _copied(model) -> List[str]:
+    return [c.key for c in model.__mapper__.column_attrs if c.key not in _OWNER_COLUMNS]
+
+
+async def copy_recipe(
+    db: AsyncSession, recipe_id: int, user_id: int, target_user_id: int
+) -> Optional[int]:
+    """
+    Copies the user's recipe and its children to ``target_user_id``, returns
+    the new id (None if the recipe isn't the user's). Everything is done with
+    INSERT ... SELECT: one statement per table whatever the size of the recipe,
+    and no row goes through Python. Doesn't commit.
+    """
+    columns = _copied(Recipe)
+    # rtrim: a cut right after a word would leave a double space before the suffix
+    name = func.rtrim(
+        func.left(Recipe.name, Recipe.name.type.length - len(COPY_SUFFIX))
+    ) + COPY_SUFFIX
+    new_id = (await db.execute(
+        insert(Recipe)
+        .from_select(
+            ["user_id", *columns],
+            select(
+                literal(target_user_id),
+                *(name if c == "name" else getattr(Recipe, c) for c in columns),
+            ).where(Recipe.id == recipe_id, Recipe.user_id == user_id),
+        )
+        .returning(Recipe.id)
+    )).scalar_one_or_none()
+    if new_id is None:
+        return None
+
+    for table in CHILD_TABLES:
+        columns = _copied(table.model)
+        await db.execute(
+            insert(table.model).from_select(
+                ["user_id", "recipe_id", *columns],
+                select(
+                    literal(target_user_id),
+                    literal(new_id),
+                    *(getattr(table.model, c) for c in columns),
+                )
+                .where(table.model.recipe_id == recipe_id)
+                # new ids in the same order as the original rows
+                .order_by(table.model.id),
+            )
+        )
+
+    return new_id
+
+
+async def apply_recipe_update(
+    db: AsyncSession, recipe_id: int, user_id: int, payload
+) -> Optional[RecipeOut]:
+    """
+    Applies ``payload`` (RecipeUpdate) to the recipe, None if it isn't the user's.
+
+    The recipe and all its children are read in one query (row locked, so
+    concurrent autosaves of the same recipe queue up), the diff is computed in
+    memory and only what changed is written: per child table one executemany
+    UPDATE, one multi-row INSERT and one DELETE ... WHERE id = ANY(...).
+    Unchanged tables cost nothing. Doesn't commit.
+
+    Same rules as before: simple fields and child fields left as null keep
+    their value, the equipment is replaced as a whole, child rows without a
+    known id are inserted and rows missing from the payload (or from an
+    omitted list) are deleted.
+    """
+    row = (await db.execute(
+        recipe_with_children()
+        .where(Recipe.id == recipe_id, Recipe.user_id == user_id)
+        .with_for_update(of=Recipe)
+    )).mappings().first()
+    if row is None:
+        return None
+
+    recipe = dict(row)
+    changes = {
+        field: getattr(payload, field)
+        for field in RECIPE_FIELDS
+        if getattr(payload, field) is not None and getattr(payload, field) != recipe[field]
+    }
+    recipe.update(changes)
+
+    changed_tables = set()
+    for table in CHILD_TABLES:
+        current = recipe[table.out_field]
+        existing = {r["id"]: r for r in current}
+        result, updates, inserts = [], [], []
+
+        for item in table.items(payload):
+            values = table.values(item)
+            if table.many:
+                old = existing.get(item.id)
+            else:
+                old = current[0] if current else None
+            if old is None:
+                inserts.append({"user_id": user_id, "recipe_id": recipe_id, **values})
+                continue
+            if table.many:
+                values = {k: (v if v is not None else old[k]) for k, v in values.items()}
+            new = {**old, **values}
+            if new != old:
+                updates.append(new)
+            result.append(new)
+
+        kept = {r["id"] for r in result}
+        # equipment is 0..1 and never deleted
+        deleted = [id for id in existing if id not in kept] if table.many else []
+
+        if updates:
+            await db.execute(update(table.model), updates)
+        if inserts:
+            for new, id in zip(inserts, await _insert_rows(db, table.model, inserts)):
+                result.append({**new, "id": id})
+        if deleted:
+            await db.execute(delete(table.model).where(in_ids(table.model.id, deleted)))
+
+        if updates or inserts or deleted:
+            changed_tables.add(table.model)
+        if table.many:
+            recipe[table.out_field] = result
+        else:
+            recipe[table.out_field] = result[0] if result else (current[0] if current else None)
+
+    if recipe["og"] is None or changed_tables & STATS_TABLES:
+        stats = stats_values(calculate_recipe(_vectors(recipe)))
+        changes.update({f: v for f, v in stats.items() if v != recipe[f]})
+        recipe.update(stats)
+
+    if changes or changed_tables:
+        # updated_at too when only children changed: it versions the whole recipe
+        await db.execute(
+            update(Recipe)
+            .where(Recipe.id == recipe_id)
+            .values(**changes, updated_at=func.now())
+        )
+
+    return RecipeOut.model_validate(recipe)
@@ -0,0 +1,344 @@
+# utils/beerxml.py
+"""
+BeerXML 1.0 <-> recipe payloads.
+
+Export writes one <RECIPE> at a time (``recipe_to_xml``) so a document can be
+streamed between DOCUMENT_START and DOCUMENT_END. Import goes through
+``RecipeParser``, an incremental parser: it is fed the request body chunk by
+chunk and hands back each <RECIPE> as soon as it is closed, dropping the parsed
+elements, so memory doesn't grow with the size of the file.
+
+Units: BeerXML uses kg / liters / minutes / percent and Lovibond (fermentables)
+or SRM (recipe color); the app stores grams, liters, minutes, percent and EBC.
+Enumerated values (TYPE, USE, FORM...) are passed through as they are, so
+exported recipes come back unchanged.
+"""
+import re
+from typing import List, Optional
+from xml.etree.ElementTree import Element, SubElement, XMLPullParser, tostring
+
+DOCUMENT_START = '<?xml version="1.0" encoding="UTF-8"?>\n<RECIPES>\n'
+DOCUMENT_END = "</RECIPES>\n"
+
+# the only fields BeerXML has no place for
+DEFAULT_BOIL_TEMPERATURE = 100.0
+DEFAULT_RECIPE_TYPE = "All Grain"
+
+_RANGE = re.compile(r"^\s*(-?\d+(?:[.,]\d+)?)\s*(?:-|–|to)\s*(-?\d+(?:[.,]\d+)?)")
+
+
+# ---------- units ----------
+def ebc_to_srm(ebc: float) -> float:
+    return ebc / 1.97
+
+
+def srm_to_ebc(srm: float) -> float:
+    return srm * 1.97
+
+
+def ebc_to_lovibond(ebc: float) -> float:
+    return (ebc_to_srm(ebc) + 0.76) / 1.3546
+
+
+def lovibond_to_ebc(lovibond: float) -> float:
+    # the Lovibond -> SRM fit goes negative below ~0.56 °L (sugars are often 0)
+    return max(0.0, srm_to_ebc(lovibond * 1.3546 - 0.76))
+
+
+def potential_to_yield(potential: float) -> float:
+    """Specific gravity points (1.037) -> percent of sucrose's yield (1.046)."""
+    return (potential - 1) / 0.046 * 100
+
+
+def yield_to_potential(percent: float) -> float:
+    return 1 + percent / 100 * 0.046
+
+
+# ---------- export ----------
+def _fmt(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return format(float(value), ".6g")
+    return str(value)
+
+
+def _add(parent: Element, tag: str, value) -> None:
+    """<TAG>value</TAG>, skipped when there is no value."""
+    text = _fmt(value)
+    if text is not None and text != "":
+        SubElement(parent, tag).text = text
+
+
+def _record(parent: Element, tag: str, name: str) -> Element:
+    elem = SubElement(parent, tag)
+    _add(elem, "NAME", name)
+    _add(elem, "VERSION", 1)
+    return elem
+
+
+def _kg(grams) -> Optional[float]:
+    return grams / 1000 if grams is not None else None
+
+
+def _temperature_range(text: Optional[str]):
+    match = _RANGE.match(text or "")
+    if not match:
+        return None, None
+    return tuple(float(v.replace(",", ".")) for v in match.groups())
+
+
+def recipe_to_xml(recipe) -> str:
+    """One <RECIPE> element of a RecipeOut."""
+    root = _record(Element("RECIPES"), "RECIPE", recipe.name)
+    _add(root, "TYPE", recipe.type)
+    style = _record(root, "STYLE", recipe.style or "")
+    _add(style, "TYPE", "Ale")
+    _add(root, "BREWER", recipe.author)
+    _add(root, "NOTES", recipe.notes)
+    _add(root, "TASTE_NOTES", recipe.description)
+
+    eq = recipe.recipe_equipment
+    if eq is not None:
+        boil_off = eq.boil_off or 0.0
+        boil_size = (
+            eq.batch_volume
+            + (eq.dead_space or 0.0)
+            + (eq.trub_loss or 0.0)
+            + boil_off * eq.boil_time / 60
+        )
+        _add(root, "BATCH_SIZE", eq.batch_volume)
+        _add(root, "BOIL_SIZE", boil_size)
+        _add(root, "BOIL_TIME", eq.boil_time)
+        _add(root, "EFFICIENCY", eq.efficiency)
+
+        equipment = _record(root, "EQUIPMENT", eq.name)
+        _add(equipment, "BATCH_SIZE", eq.batch_volume)
+        _add(equipment, "BOIL_SIZE", boil_size)
+        _add(equipment, "BOIL_TIME", eq.boil_time)
+        # BeerXML: percent of the pre-boil volume per hour; the app: liters per hour
+        _add(equipment, "EVAP_RATE", boil_off / boil_size * 100 if boil_size else 0)
+        _add(equipment, "TRUB_CHILLER_LOSS", eq.trub_loss)
+        _add(equipment, "LAUTER_DEADSPACE", eq.dead_space)
+        _add(equipment, "NOTES", eq.description)
+
+    hops = SubElement(root, "HOPS")
+    for h in recipe.recipe_hops:
+        hop = _record(hops, "HOP", h.name)
+        _add(hop, "ALPHA", h.alpha_acid_content or 0)
+        _add(hop, "AMOUNT", _kg(h.quantity) or 0)
+        _add(hop, "USE", h.usage_stage or "Boil")
+        _add(hop, "TIME", h.boil_time or 0)
+        _add(hop, "TYPE", h.use_type)
+        _add(hop, "BETA", h.beta_acid_content)
+        _add(hop, "ORIGIN", h.country_of_origin)
+        _add(hop, "NOTES", h.description)
+
+    fermentables = SubElement(root, "FERMENTABLES")
+    for f in recipe.recipe_fermentables:
+        fermentable = _record(fermentables, "FERMENTABLE", f.name)
+        _add(fermentable, "TYPE", f.type or "Grain")
+        _add(fermentable, "AMOUNT", _kg(f.quantity) or 0)
+        _add(fermentable, "YIELD", potential_to_yield(f.potential_extract))
+        _add(fermentable, "COLOR", ebc_to_lovibond(f.ebc))
+        _add(fermentable, "SUPPLIER", f.supplier)
+        _add(fermentable, "NOTES", f.description)
+
+    miscs = SubElement(root, "MISCS")
+    for m in recipe.recipe_misc:
+        misc = _record(miscs, "MISC", m.name)
+        _add(misc, "TYPE", m.type or "Other")
+        _add(misc, "USE", m.use or "Boil")
+        _add(misc, "TIME", m.time or 0)
+        _add(misc, "AMOUNT", _kg(m.quantity) or 0)
+        _add(misc, "AMOUNT_IS_WEIGHT", True)
+        _add(misc, "NOTES", m.description)
+
+    yeasts = SubElement(root, "YEASTS")
+    for y in recipe.recipe_yeasts:
+        yeast = _record(yeasts, "YEAST", y.name)
+        _add(yeast, "TYPE", y.type or "Ale")
+        _add(yeast, "FORM", y.form or "Dry")
+        _add(yeast, "AMOUNT", _kg(y.quantity))
+        _add(yeast, "AMOUNT_IS_WEIGHT", True if y.quantity is not None else None)
+        _add(yeast, "LABORATORY", y.manufacturer)
+        _add(yeast, "ATTENUATION", y.attenuation)
+        low, high = _temperature_range(y.temperature_range)
+        _add(yeast, "MIN_TEMPERATURE", low)
+        _add(yeast, "MAX_TEMPERATURE", high)
+        _add(yeast, "FLOCCULATION", y.flocculation)
+        _add(yeast, "BEST_FOR", y.flavor_profile)
+        _add(yeast, "NOTES", y.description)
+
+    SubElement(root, "WATERS")
+    mash = _record(root, "MASH", "")
+    _add(mash, "GRAIN_TEMP", 20)
+    SubElement(mash, "MASH_STEPS")
+
+    # display-only fields of the spec (appendix); ignored on import
+    _add(root, "EST_OG", recipe.og)
+    _add(root, "EST_FG", recipe.fg)
+    _add(root, "EST_COLOR", ebc_to_srm(recipe.ebc) if recipe.ebc is not None else None)
+    _add(root, "IBU", recipe.ibu)
+    _add(root, "EST_ABV", recipe.abv)
+
+    return tostring(root, encoding="unicode") + "\n"
+
+
+# ---------- import ----------
+def _text(elem: Optional[Element], tag: str) -> Optional[str]:
+    if elem is None:
+        return None
+    text = elem.findtext(tag)
+    return text.strip() if text and text.strip() else None
+
+
+def _float(elem: Optional[Element], tag: str) -> Optional[float]:
+    text = _text(elem, tag)
+    if text is None:
+        return None
+    try:
+        return float(text.replace(",", "."))
+    except ValueError:
+        return None
+
+
+def _grams(elem: Element) -> Optional[float]:
+    amount = _float(elem, "AMOUNT")
+    # AMOUNT is kg, or liters when AMOUNT_IS_WEIGHT is false: taken as 1 kg/L
+    return amount * 1000 if amount is not None else None
+
+
+def _int(value: Optional[float]) -> Optional[int]:
+    return round(value) if value is not None else None
+
+
+def _items(root: Element, group: str, tag: str) -> List[Element]:
+    parent = root.find(group)
+    return parent.findall(tag) if parent is not None else []
+
+
+def recipe_from_element(root: Element) -> dict:
+    """A <RECIPE> element as a RecipeCreate payload (not validated yet)."""
+    eq = root.find("EQUIPMENT")
+    batch_size = _float(eq, "BATCH_SIZE") or _float(root, "BATCH_SIZE")
+    boil_time = _float(eq, "BOIL_TIME") or _float(root, "BOIL_TIME")
+
+    equipment = None
+    if batch_size is not None:
+        boil_size = _float(eq, "BOIL_SIZE") or _float(root, "BOIL_SIZE") or batch_size
+        evap_rate = _float(eq, "EVAP_RATE")
+        equipment = {
+            "name": _text(eq, "NAME") or _text(root, "NAME"),
+            "description": _text(eq, "NOTES"),
+            "efficiency": _float(root, "EFFICIENCY") or 75.0,
+            "batchVolume": batch_size,
+            "boilTime": _int(boil_time) or 60,
+            "boilTemperature": DEFAULT_BOIL_TEMPERATURE,
+            "boilOff": evap_rate / 100 * boil_size if evap_rate is not None else None,
+            "deadSpace": _float(eq, "LAUTER_DEADSPACE"),
+            "trubLoss": _float(eq, "TRUB_CHILLER_LOSS"),
+        }
+
+    yeasts = []
+    for y in _items(root, "YEASTS", "YEAST"):
+        low, high = _float(y, "MIN_TEMPERATURE"), _float(y, "MAX_TEMPERATURE")
+        yeasts.append({
+            "name": _text(y, "NAME"),
+            "manufacturer": _text(y, "LABORATORY"),
+            "type": _text(y, "TYPE"),
+            "form": _text(y, "FORM"),
+            "attenuation": _float(y, "ATTENUATION"),
+            "temperatureRange": (
+                f"{low:g}-{high:g}" if low is not None and high is not None else None
+            ),
+            "flavorProfile": _text(y, "BEST_FOR"),
+            "flocculation": _text(y, "FLOCCULATION"),
+            "description": _text(y, "NOTES"),
+            "quantity": _grams(y),
+        })
+
+    return {
+        "name": _text(root, "NAME"),
+        "style": _text(root.find("STYLE"), "NAME"),
+        "description": _text(root, "TASTE_NOTES"),
+        "notes": _text(root, "NOTES"),
+        "author": _text(root, "BREWER"),
+        "type": _text(root, "TYPE") or DEFAULT_RECIPE_TYPE,
+        "recipeEquipment": equipment,
+        "recipeFermentables": [
+            {
+                "name": _text(f, "NAME"),
+                "description": _text(f, "NOTES"),
+                "ebc": lovibond_to_ebc(_float(f, "COLOR") or 0),
+                "potentialExtract": yield_to_potential(_float(f, "YIELD") or 0),
+                "type": _text(f, "TYPE"),
+                "supplier": _text(f, "SUPPLIER"),
+                "quantity": _grams(f),
+            }
+            for f in _items(root, "FERMENTABLES", "FERMENTABLE")
+        ],
+        "recipeHops": [
+            {
+                "name": _text(h, "NAME"),
+                "alphaAcidContent": _float(h, "ALPHA"),
+                "betaAcidContent": _float(h, "BETA"),
+                "useType": _text(h, "TYPE"),
+                "countryOfOrigin": _text(h, "ORIGIN"),
+                "description": _text(h, "NOTES"),
+                "quantity": _grams(h),
+                "boilTime": _int(_float(h, "TIME")),
+                "usageStage": _text(h, "USE"),
+            }
+            for h in _items(root, "HOPS", "HOP")
+        ],
+        "recipeMisc": [
+            {
+                "name": _text(m, "NAME"),
+                "description": _text(m, "NOTES"),
+                "type": _text(m, "TYPE"),
+                "quantity": _grams(m),
+                "use": _text(m, "USE"),
+                "time": _int(_float(m, "TIME")),
+            }
+            for m in _items(root, "MISCS", "MISC")
+        ],
+        "recipeYeasts": yeasts,
+    }
+
+
+class RecipeParser:
+    """
+    Incremental BeerXML reader: ``feed()`` bytes as they arrive, get back the
+    recipes closed so far. Raises xml.etree.ElementTree.ParseError on bad XML.
+    """
+
+    def __init__(self):
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._open: List[Element] = []
+
+    def feed(self, data: bytes) -> List[dict]:
+        self._parser.feed(data)
+        return self._collect()
+
+    def close(self) -> List[dict]:
+        self._parser.close()
+        return self._collect()
+
+    def _collect(self) -> List[dict]:
+        recipes = []
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                self._open.append(elem)
+                continue
+
+            self._open.pop()
+            if elem.tag == "RECIPE":
+                recipes.append(recipe_from_element(elem))
+                # done with it: detach it so the tree never holds more than one recipe
+                if self._open:
+                    self._open[-1].remove(elem)
+                elem.clear()
+        return recipes
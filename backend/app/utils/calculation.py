@@ -0,0 +1,306 @@
+# utils/calculation.py
+"""
+Brewing formulas (OG, FG, ABV, IBU, EBC, BU:GU, pre-boil volume).
+
+Port of frontend/src/Pages/Recipes/utils/calculation.js; results are rounded
+the same way the frontend does so both sides show identical numbers.
+
+Ingredients are kept as flat ``array('d')`` columns instead of ORM objects, so
+a recipe can be built straight from ``select(col, ...)`` rows or a request
+payload and evaluated without any attribute lookups.
+"""
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass, field
+from math import exp
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+LITERS_PER_GALLON = 3.78541
+LB_PER_KG = 2.20462
+DEFAULT_POTENTIAL = 1.036
+DEFAULT_ATTENUATION = 75.0
+ABV_FACTOR = 131.25
+
+
+def _num(x) -> float:
+    return float(x) if x is not None else 0.0
+
+
+def _column(rows: Sequence[Sequence], idx: int) -> array:
+    return array("d", [_num(r[idx]) for r in rows])
+
+
+@dataclass(slots=True)
+class RecipeVectors:
+    # equipment
+    batch_volume: float = 0.0
+    efficiency: float = 0.0
+    boil_time: float = 0.0
+    boil_off: float = 0.0
+    dead_space: float = 0.0
+    trub_loss: float = 0.0
+
+    # fermentables
+    fermentable_quantity: array = field(default_factory=lambda: array("d"))
+    potential_extract: array = field(default_factory=lambda: array("d"))
+    ebc: array = field(default_factory=lambda: array("d"))
+
+    # hops
+    hop_quantity: array = field(default_factory=lambda: array("d"))
+    alpha_acid: array = field(default_factory=lambda: array("d"))
+    hop_boil_time: array = field(default_factory=lambda: array("d"))
+
+    # yeasts
+    attenuation: array = field(default_factory=lambda: array("d"))
+
+    @classmethod
+    def from_rows(
+        cls,
+        equipment: Optional[Sequence] = None,
+        fermentables: Iterable[Sequence] = (),
+        hops: Iterable[Sequence] = (),
+        yeasts: Iterable = (),
+    ) -> "RecipeVectors":
+        """
+        equipment:    (batch_volume, efficiency, boil_time, boil_off, dead_space, trub_loss)
+        fermentables: rows of (quantity, potential_extract, ebc)
+        hops:         rows of (quantity, alpha_acid_content, boil_time)
+        yeasts:       attenuation values
+        """
+        fermentables = list(fermentables)
+        hops = list(hops)
+        v = cls(
+            fermentable_quantity=_column(fermentables, 0),
+            potential_extract=_column(fermentables, 1),
+            ebc=_column(fermentables, 2),
+            hop_quantity=_column(hops, 0),
+            alpha_acid=_column(hops, 1),
+            hop_boil_time=_column(hops, 2),
+            attenuation=array("d", [_num(a) for a in yeasts]),
+        )
+        if equipment is not None:
+            (
+                v.batch_volume,
+                v.efficiency,
+                v.boil_time,
+                v.boil_off,
+                v.dead_space,
+                v.trub_loss,
+            ) = (_num(x) for x in equipment)
+        return v
+
+
+@dataclass(slots=True)
+class RecipeStats:
+    og: float
+    fg: float
+    abv: float
+    ibu: float
+    ebc: float
+    bu_gu: float
+    pre_boil_volume: float
+    hop_ibus: list[float] = field(default_factory=list)
+
+
+def calculate_og(v: RecipeVectors) -> float:
+    if not v.fermentable_quantity or not v.batch_volume or not v.efficiency:
+        return 1.0
+
+    volume_gallons = v.batch_volume / LITERS_PER_GALLON
+    efficiency = v.efficiency / 100
+
+    points = 0.0
+    for qty, potential in zip(v.fermentable_quantity, v.potential_extract):
+        weight_lb = qty / 1000 * LB_PER_KG
+        points += weight_lb * ((potential or DEFAULT_POTENTIAL) - 1) * 1000 * efficiency
+
+    return round(points / volume_gallons / 1000 + 1, 3)
+
+
+def calculate_fg(v: RecipeVectors, og: float) -> float:
+    attenuation = max((a for a in v.attenuation if a), default=DEFAULT_ATTENUATION)
+    return round(og - (og - 1) * (attenuation / 100), 3)
+
+
+def calculate_ebc(v: RecipeVectors) -> float:
+    if not v.fermentable_quantity or not v.batch_volume:
+        return 0.0
+
+    total = 0.0
+    for qty, ebc in zip(v.fermentable_quantity, v.ebc):
+        total += (qty / 1000 * ebc) / v.batch_volume
+
+    # same as the frontend: efficiency is not taken into account
+    return round(total * 10, 2)
+
+
+def calculate_ibu(v: RecipeVectors, og: float) -> tuple[float, list[float]]:
+    """Tinseth. Returns the recipe total and the contribution of each hop."""
+    if not v.hop_quantity or v.batch_volume <= 0 or og <= 0:
+        return 0.0, []
+
+    bigness = 1.65 * 0.000125 ** (og - 1)
+
+    total = 0.0
+    hop_ibus: list[float] = []
+    for qty, alpha, boil_time in zip(v.hop_quantity, v.alpha_acid, v.hop_boil_time):
+        if not qty or not alpha:
+            hop_ibus.append(0.0)
+            continue
+        utilization = bigness * ((1 - exp(-0.04 * boil_time)) / 4.15)
+        ibu = (utilization * (alpha / 100) * qty * 1000) / v.batch_volume
+        total += ibu
+        hop_ibus.append(round(ibu, 2))
+
+    return round(total, 2), hop_ibus
+
+
+def calculate_pre_boil_volume(v: RecipeVectors) -> float:
+    return round(
+        v.batch_volume + v.dead_space + v.boil_off * (v.boil_time / 60) + v.trub_loss,
+        3,
+    )
+
+
+def calculate_abv(og: float, fg: float) -> float:
+    return max(round((og - fg) * ABV_FACTOR, 2), 0.0)
+
+
+def calculate_bu_gu(ibu: float, og: float) -> float:
+    gu = (og - 1) * 1000
+    if gu > 0 and ibu:
+        return round(ibu / gu, 2)
+    return 0.0
+
+
+def calculate_recipe(v: RecipeVectors) -> RecipeStats:
+    og = calculate_og(v)
+    fg = calculate_fg(v, og)
+    ibu, hop_ibus = calculate_ibu(v, og)
+    return RecipeStats(
+        og=og,
+        fg=fg,
+        abv=calculate_abv(og, fg),
+        ibu=ibu,
+        ebc=calculate_ebc(v),
+        bu_gu=calculate_bu_gu(ibu, og),
+        pre_boil_volume=calculate_pre_boil_volume(v),
+        hop_ibus=hop_ibus,
+    )
+
+
+# ---------- batch (many recipes at once) ----------
+@dataclass(slots=True)
+class RecipeStatsBatch:
+    ids: np.ndarray
+    og: np.ndarray
+    fg: np.ndarray
+    abv: np.ndarray
+    ibu: np.ndarray
+    ebc: np.ndarray
+    bu_gu: np.ndarray
+
+    def to_records(self) -> list[dict]:
+        keys = ("id", "og", "fg", "abv", "ibu", "ebc", "bu_gu")
+        cols = (
+            self.ids.tolist(),
+            self.og.tolist(),
+            self.fg.tolist(),
+            self.abv.tolist(),
+            self.ibu.tolist(),
+            self.ebc.tolist(),
+            self.bu_gu.tolist(),
+        )
+        return [dict(zip(keys, values)) for values in zip(*cols)]
+
+
+def _matrix(rows: Sequence[Sequence], width: int) -> np.ndarray:
+    if not rows:
+        return np.zeros((0, width))
+    # None -> nan -> 0, Decimal -> float
+    return np.nan_to_num(np.array(rows, dtype=float).reshape(-1, width))
+
+
+def calculate_batch(
+    recipe_ids: Iterable[int],
+    equipment: Sequence[Sequence] = (),
+    fermentables: Sequence[Sequence] = (),
+    hops: Sequence[Sequence] = (),
+    yeasts: Sequence[Sequence] = (),
+) -> RecipeStatsBatch:
+    """
+    Same formulas as calculate_recipe, evaluated for every recipe in one pass.
+    Every row starts with its recipe_id:
+        equipment:    (recipe_id, batch_volume, efficiency)
+        fermentables: (recipe_id, quantity, potential_extract, ebc)
+        hops:         (recipe_id, quantity, alpha_acid_content, boil_time)
+        yeasts:       (recipe_id, attenuation)
+    """
+    ids = np.unique(np.fromiter(recipe_ids, dtype=np.int64))
+    n = len(ids)
+
+    eq = _matrix(equipment, 3)
+    fe = _matrix(fermentables, 4)
+    ho = _matrix(hops, 4)
+    ye = _matrix(yeasts, 2)
+
+    def slot(m: np.ndarray) -> np.ndarray:
+        return np.searchsorted(ids, m[:, 0].astype(np.int64))
+
+    # equipment -> one row per recipe (missing equipment stays 0)
+    per_recipe = np.zeros((n, 2))
+    per_recipe[slot(eq)] = eq[:, 1:]
+    volume, efficiency = per_recipe[:, 0], per_recipe[:, 1]
+    has_volume = volume != 0
+    safe_volume = np.where(has_volume, volume, 1.0)
+
+    # OG
+    f_idx = slot(fe)
+    f_qty, f_potential, f_ebc = fe[:, 1], fe[:, 2], fe[:, 3]
+    f_potential = np.where(f_potential != 0, f_potential, DEFAULT_POTENTIAL)
+    points = np.bincount(
+        f_idx,
+        weights=f_qty / 1000 * LB_PER_KG * (f_potential - 1) * 1000 * efficiency[f_idx] / 100,
+        minlength=n,
+    )
+    has_fermentables = np.bincount(f_idx, minlength=n) > 0
+    og_valid = has_fermentables & has_volume & (efficiency != 0)
+    og = np.where(og_valid, points / (safe_volume / LITERS_PER_GALLON) / 1000 + 1, 1.0)
+    og = np.round(og, 3)
+
+    # FG: highest attenuation among the yeasts that have one
+    attenuation = np.full(n, -np.inf)
+    y_att = ye[:, 1]
+    np.maximum.at(attenuation, slot(ye), np.where(y_att > 0, y_att, -np.inf))
+    attenuation = np.where(np.isfinite(attenuation), attenuation, DEFAULT_ATTENUATION)
+    fg = np.round(og - (og - 1) * (attenuation / 100), 3)
+
+    # IBU (Tinseth)
+    h_idx = slot(ho)
+    h_qty, h_alpha, h_boil = ho[:, 1], ho[:, 2], ho[:, 3]
+    bigness = 1.65 * 0.000125 ** (og - 1)
+    utilization = bigness[h_idx] * ((1 - np.exp(-0.04 * h_boil)) / 4.15)
+    hop_ibu = utilization * (h_alpha / 100) * h_qty * 1000 / safe_volume[h_idx]
+    ibu = np.bincount(h_idx, weights=hop_ibu, minlength=n)
+    ibu = np.round(np.where((volume > 0) & (og > 0), ibu, 0.0), 2)
+
+    # EBC
+    # divided row by row, like calculate_ebc, so both round the same way
+    ebc = np.bincount(f_idx, weights=f_qty / 1000 * f_ebc / safe_volume[f_idx], minlength=n)
+    ebc = np.round(np.where(has_fermentables & has_volume, ebc * 10, 0.0), 2)
+
+    gu = (og - 1) * 1000
+    bu_gu = np.where((gu > 0) & (ibu != 0), ibu / np.where(gu > 0, gu, 1.0), 0.0)
+
+    return RecipeStatsBatch(
+        ids=ids,
+        og=og,
+        fg=fg,
+        abv=np.maximum(np.round((og - fg) * ABV_FACTOR, 2), 0.0),
+        ibu=ibu,
+        ebc=ebc,
+        bu_gu=np.round(bu_gu, 2),
+    )
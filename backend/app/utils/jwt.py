@@ -1,9 +1,64 @@
 # utils/jwt.py
+"""
+JWT encode/decode behind one interface, so the library can be chosen with
+JWT_BACKEND ("jose" = python-jose, "pyjwt" = PyJWT). Both produce the same
+bytes for the same claims: tokens issued by one are accepted by the other.
+"""
 from datetime import datetime, timezone, timedelta
-from jose import jwt
+
 from ..config import settings
 
 
+class InvalidTokenError(Exception):
+    pass
+
+
+class TokenExpiredError(InvalidTokenError):
+    pass
+
+
+class JWTBackend:
+    def __init__(self, name: str):
+        if name == "jose":
+            from jose import jwt, ExpiredSignatureError, JWTError
+
+            self._expired, self._invalid = ExpiredSignatureError, JWTError
+        elif name == "pyjwt":
+            import jwt
+
+            self._expired, self._invalid = jwt.ExpiredSignatureError, jwt.InvalidTokenError
+        else:
+            raise ValueError(f"Invalid JWT_BACKEND: {name!r}")
+
+        self.name = name
+        self._jwt = jwt
+
+    def encode(self, claims: dict, secret: str, algorithm: str) -> str:
+        return self._jwt.encode(claims, secret, algorithm=algorithm)
+
+    def decode(self, token: str, secret: str, algorithm: str) -> dict:
+        """Checks signature and exp; raises TokenExpiredError / InvalidTokenError."""
+        try:
+            return self._jwt.decode(
+                token, secret, algorithms=[algorithm], options={"verify_aud": False}
+            )
+        except self._expired as e:
+            raise TokenExpiredError(str(e)) from e
+        except self._invalid as e:
+            raise InvalidTokenError(str(e)) from e
+
+
+backend = JWTBackend(settings.JWT_BACKEND)
+
+
+def encode_token(claims: dict) -> str:
+    return backend.encode(claims, settings.JWT_SECRET, settings.JWT_ALG)
+
+
+def decode_token(token: str) -> dict:
+    return backend.decode(token, settings.JWT_SECRET, settings.JWT_ALG)
+
+
 def make_access_token(user_id: int, *, hours=4):
     now = datetime.now(timezone.utc)
     payload = {
@@ -13,4 +68,4 @@ def make_access_token(user_id: int, *, hours=4):
         "exp": int((now + timedelta(hours=hours)).timestamp()),
         "iss": "brewchemy",
     }
-    return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALG)
+    return encode_token(payload)
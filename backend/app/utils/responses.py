@@ -0,0 +1,37 @@
+# utils/responses.py
+"""
+JSON rendering.
+
+The app's default response class is ORJSONResponse (see main.py). For the big
+recipe lists even that leaves most of the time in FastAPI's own pipeline: the
+returned models are validated again against response_model, dumped to dicts
+and only then encoded. ``json_response`` skips all of it: the models are
+already validated, pydantic-core writes the JSON bytes straight from them.
+"""
+from functools import lru_cache
+from typing import Any, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def _adapter(type_) -> TypeAdapter:
+    return TypeAdapter(type_)
+
+
+def dump_json(type_, value: Any) -> bytes:
+    """``value`` (an instance of ``type_``, e.g. List[RecipeOut]) as JSON, camelCase."""
+    return _adapter(type_).dump_json(value, by_alias=True)
+
+
+def json_response(type_, value: Any, response: Optional[Response] = None) -> Response:
+    """
+    Response with ``value`` serialized as ``type_``. A returned Response
+    bypasses the one FastAPI injects into the endpoint, so the headers set
+    there (ETag, X-Next-Cursor...) are copied over from ``response``.
+    """
+    out = Response(content=dump_json(type_, value), media_type="application/json")
+    if response is not None:
+        out.headers.raw.extend(response.headers.raw)
+    return out
@@ -0,0 +1,25 @@
+# utils/search.py
+from sqlalchemy import func, or_
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def text_match(model, term: str):
+    """
+    Substring match on name/description. Both columns have pg_trgm GIN
+    indexes, so ILIKE '%term%' is an index scan instead of a seq scan.
+    """
+    pattern = _like_pattern(term)
+    return or_(
+        model.name.ilike(pattern, escape="\\"),
+        model.description.ilike(pattern, escape="\\"),
+    )
+
+
+def text_rank(model, term: str):
+    """ORDER BY clauses: closest names first, description-only hits last."""
+    return (func.similarity(model.name, term).desc(), model.name, model.id)
+
@@ -0,0 +1,10 @@
+# utils/sql.py
+from typing import Iterable
+
+from sqlalchemy import Integer, any_, literal
+from sqlalchemy.dialects.postgresql import ARRAY
+
+
+def in_ids(column, ids: Iterable[int]):
+    # "= ANY($1::integer[])": one array parameter instead of one per id
+    return column == any_(literal(list(ids), ARRAY(Integer)))
@@ -0,0 +1,16 @@
+# utils/sse.py
+"""Server-Sent Events framing (text/event-stream)."""
+import json
+from typing import Any, Optional
+
+MEDIA_TYPE = "text/event-stream"
+
+# nothing in between may cache or buffer the stream (nginx honours X-Accel-Buffering)
+HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(data: Any, event: Optional[str] = None) -> str:
+    """One event; ``data`` goes out as JSON, so newlines in it can't break the framing."""
+    lines = [] if event is None else [f"event: {event}"]
+    lines.append("data: " + json.dumps(data, ensure_ascii=False))
+    return "\n".join(lines) + "\n\n"
@@ -13,6 +13,9 @@ alembic upgrade head
 echo "inserting data..."
 python -m app.scripts.seed
 
+echo "backfilling recipe stats..."
+python -m app.scripts.backfill_recipe_stats
+
 echo "starting FastAPI server..."
 : "${PORT:=10000}"
 : "${WORKERS:=4}"
@@ -0,0 +1,16 @@
+from app.utils.beerxml import RecipeParser
+
+
+def _import(fermentable: str) -> dict:
+    parser = RecipeParser()
+    recipes = parser.feed(
+        f"<RECIPES><RECIPE><NAME>Test</NAME><FERMENTABLES>{fermentable}"
+        "</FERMENTABLES></RECIPE></RECIPES>".encode()
+    )
+    return recipes + parser.close()
+
+
+def test_colorless_fermentable_imports_with_non_negative_ebc():
+    for color in ("<COLOR>0</COLOR>", "<COLOR>0.5</COLOR>", ""):
+        (recipe,) = _import(f"<FERMENTABLE><NAME>Corn Sugar</NAME>{color}</FERMENTABLE>")
+        assert recipe["recipeFermentables"][0]["ebc"] >= 0